@@ -0,0 +1,25 @@
+"""Add composite index on jobs (status, completed_at)
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-15 00:00:02.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_jobs_status_completed_at', 'jobs', ['status', 'completed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_status_completed_at', table_name='jobs')
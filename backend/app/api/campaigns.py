@@ -3,7 +3,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
 from datetime import datetime
+import asyncio
 import os
+import shutil
 import uuid
 import random
 import logging
@@ -318,6 +320,14 @@ async def cancel_campaign(
 
 # Video upload endpoint
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./uploads")
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _copy_upload(src, dest_path: str) -> int:
+    """Stream an uploaded file to disk in fixed-size chunks, returning bytes written."""
+    with open(dest_path, "wb") as buffer:
+        shutil.copyfileobj(src, buffer, UPLOAD_CHUNK_SIZE)
+        return buffer.tell()
 
 
 @router.post("/upload-video")
@@ -344,9 +354,7 @@ async def upload_video(
 
     # Save file
     try:
-        with open(file_path, "wb") as buffer:
-            content = await video.read()
-            buffer.write(content)
+        size = await asyncio.to_thread(_copy_upload, video.file, file_path)
 
         logger.info(f"Video uploaded: {file_path}")
 
@@ -355,7 +363,7 @@ async def upload_video(
             "filename": unique_filename,
             "original_filename": video.filename,
             "path": file_path,
-            "size": len(content)
+            "size": size
         }
     except Exception as e:
         logger.error(f"Failed to upload video: {e}")
@@ -388,9 +396,7 @@ async def create_campaign_with_video(
     file_path = os.path.join(UPLOAD_DIR, "videos", unique_filename)
 
     try:
-        with open(file_path, "wb") as buffer:
-            content = await video.read()
-            buffer.write(content)
+        await asyncio.to_thread(_copy_upload, video.file, file_path)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -19,6 +19,8 @@ class Settings(BaseSettings):
     # Celery Settings
     celery_broker_url: str = "redis://localhost:6379/0"
     celery_result_backend: str = "redis://localhost:6379/1"
+    celery_max_queue_depth: int = 10000  # Producers back off above this many waiting tasks
+    celery_max_in_flight_tasks: int = 512  # Unfinished tasks a windowed producer may have out
 
     # CORS Settings
     cors_origins: list[str] = ["http://localhost:3000", "http://localhost:5173"]
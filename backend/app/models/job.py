@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, ForeignKey, Enum, DateTime, Text
+from sqlalchemy import String, Integer, ForeignKey, Enum, DateTime, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 import enum
@@ -25,6 +25,10 @@ class Job(Base):
     """Job model for individual TikTok upload tasks."""
 
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Serves the periodic cleanup of old completed/failed jobs
+        Index("ix_jobs_status_completed_at", "status", "completed_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
 
@@ -106,6 +106,8 @@ def test_variation_params():
         processor = VideoProcessor(verify_ffmpeg=False)
 
         # Generate params with seed (should be reproducible)
+        import random
+        global_state = random.getstate()
         params1 = processor._generate_variation_params(seed=42)
         params2 = processor._generate_variation_params(seed=42)
 
@@ -115,6 +117,12 @@ def test_variation_params():
             print("✗ Seeded params are not reproducible")
             return False
 
+        if random.getstate() == global_state:
+            print("✓ Seeding leaves the global random state untouched")
+        else:
+            print("✗ Seeding modified the global random state")
+            return False
+
         # Generate random params (should be different)
         params3 = processor._generate_variation_params()
         params4 = processor._generate_variation_params()
@@ -136,7 +144,7 @@ def test_variation_params():
             (0.98 <= params1['contrast'] <= 1.02, "contrast"),
             (1 <= params1['crop_top'] <= 3, "crop_top"),
             (0.97 <= params1['bitrate_factor'] <= 1.03, "bitrate_factor"),
-            (1 <= params1['noise_strength'] <= 3, "noise_strength"),
+            (0 <= params1['marker_color'] <= 0xFFFFFF, "marker_color"),
             (0.99 <= params1['speed'] <= 1.01, "speed"),
             (0 <= params1['frame_offset'] <= 3, "frame_offset"),
         ]
@@ -177,7 +185,7 @@ def test_filter_complex():
         print(f"    {filter_complex[:100]}...")
 
         # Validate filter contains expected operations
-        expected_filters = ['crop', 'scale', 'eq', 'noise', 'setpts']
+        expected_filters = ['crop', 'eq', 'drawbox', 'setpts']
         found_filters = [f for f in expected_filters if f in filter_complex]
 
         if len(found_filters) == len(expected_filters):
@@ -187,6 +195,18 @@ def test_filter_complex():
             print(f"\n✗ Missing filters: {missing}")
             return False
 
+        if 'scale' in filter_complex:
+            print("\n✗ Filter complex should not resample frames")
+            return False
+
+        # Preserving dimensions pads the crop back to the input size
+        padded = VideoProcessor(verify_ffmpeg=False, preserve_dimensions=True)
+        if 'pad=1920:1080' in padded._build_filter_complex(params, 1920, 1080):
+            print("✓ preserve_dimensions pads back to 1920x1080")
+        else:
+            print("✗ preserve_dimensions did not pad to input size")
+            return False
+
         return True
 
     except Exception as e:
@@ -6,6 +6,9 @@ Each processed video has different hash and slightly different appearance.
 """
 
 import asyncio
+import functools
+import hashlib
+import mmap
 import os
 import uuid
 import random
@@ -17,6 +20,39 @@ import subprocess
 
 logger = logging.getLogger(__name__)
 
+# Speeds this close to 1.0 are snapped to exactly 1.0 so audio can be stream-copied
+SPEED_COPY_TOLERANCE = 1e-3
+
+# Encoder settings per output profile:
+# - variation: throwaway copies that only need a unique hash, favor speed
+# - master: quality-first encodes
+ENCODING_PROFILES: Dict[str, Dict] = {
+    "variation": {"preset": "veryfast", "crf": 24, "tune": "fastdecode"},
+    "master": {"preset": "slow", "crf": 23, "tune": None},
+}
+
+# Encoders that accept -tune fastdecode (other codecs reject or ignore it)
+TUNE_CODECS = ("libx264", "libx265")
+
+
+@functools.lru_cache(maxsize=1)
+def _probe_ffmpeg() -> str:
+    """
+    Run ``ffmpeg -version`` once per process and cache the result.
+
+    Failures raise and are not cached, so a later call retries.
+
+    Returns:
+        First line of the FFmpeg version output
+    """
+    result = subprocess.run(
+        ["ffmpeg", "-version"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return result.stdout.split('\n')[0]
+
 
 class VideoProcessorError(Exception):
     """Custom exception for video processing errors"""
@@ -39,9 +75,12 @@ class VideoProcessor:
         output_format: str = "mp4",
         video_codec: str = "libx264",
         audio_codec: str = "aac",
-        preset: str = "medium",
-        crf: int = 23,
-        verify_ffmpeg: bool = True
+        preset: Optional[str] = None,
+        crf: Optional[int] = None,
+        verify_ffmpeg: bool = True,
+        preserve_dimensions: bool = False,
+        profile: str = "variation",
+        threads: Optional[int] = None
     ):
         """
         Initialize VideoProcessor.
@@ -50,15 +89,32 @@ class VideoProcessor:
             output_format: Output video format (default: mp4)
             video_codec: Video codec to use (default: libx264/h264)
             audio_codec: Audio codec to use (default: aac)
-            preset: FFmpeg encoding preset (default: medium)
-            crf: Constant Rate Factor for quality (default: 23, lower=better)
+            preset: FFmpeg encoding preset (default: taken from profile)
+            crf: Constant Rate Factor for quality (default: taken from profile, lower=better)
             verify_ffmpeg: Whether to verify FFmpeg on init (default: True)
+            preserve_dimensions: Pad cropped frames back to the input size
+                instead of emitting the slightly smaller crop (default: False)
+            profile: Encoding profile, "variation" (fast) or "master" (quality)
+                (default: variation)
+            threads: FFmpeg encoder/filter thread budget per process
+                (default: half the CPU cores, at least 1)
         """
+        if profile not in ENCODING_PROFILES:
+            raise VideoProcessorError(
+                f"Unknown encoding profile: {profile} "
+                f"(expected one of {', '.join(ENCODING_PROFILES)})"
+            )
+        profile_settings = ENCODING_PROFILES[profile]
+
         self.output_format = output_format
         self.video_codec = video_codec
         self.audio_codec = audio_codec
-        self.preset = preset
-        self.crf = crf
+        self.profile = profile
+        self.preset = preset if preset is not None else profile_settings["preset"]
+        self.crf = crf if crf is not None else profile_settings["crf"]
+        self.tune = profile_settings["tune"] if video_codec in TUNE_CODECS else None
+        self.threads = threads or max(1, (os.cpu_count() or 1) // 2)
+        self.preserve_dimensions = preserve_dimensions
         self._ffmpeg_verified = False
 
         # Verify FFmpeg is available (if requested)
@@ -68,13 +124,8 @@ class VideoProcessor:
     def _verify_ffmpeg(self) -> None:
         """Verify FFmpeg is installed and accessible"""
         try:
-            result = subprocess.run(
-                ["ffmpeg", "-version"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            logger.info("FFmpeg found: %s", result.stdout.split('\n')[0])
+            version = _probe_ffmpeg()
+            logger.debug("FFmpeg found: %s", version)
             self._ffmpeg_verified = True
         except (subprocess.CalledProcessError, FileNotFoundError) as e:
             raise VideoProcessorError(
@@ -89,7 +140,8 @@ class VideoProcessor:
     async def _run_ffmpeg(
         self,
         args: List[str],
-        operation: str = "process"
+        operation: str = "process",
+        stdin: Optional[int] = None
     ) -> Tuple[str, str]:
         """
         Run FFmpeg command asynchronously.
@@ -97,6 +149,7 @@ class VideoProcessor:
         Args:
             args: FFmpeg command arguments
             operation: Description of operation for logging
+            stdin: Optional file descriptor to feed FFmpeg's stdin (for pipe:0 input)
 
         Returns:
             Tuple of (stdout, stderr)
@@ -111,6 +164,7 @@ class VideoProcessor:
         try:
             process = await asyncio.create_subprocess_exec(
                 *cmd,
+                stdin=stdin,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
@@ -141,38 +195,43 @@ class VideoProcessor:
         Returns:
             Dictionary of variation parameters
         """
-        if seed is not None:
-            random.seed(seed)
+        # Use a private generator so seeding never touches the global random
+        # state (safe with concurrent variations)
+        rng = random.Random(seed) if seed is not None else random
 
         params = {
             # Brightness: -0.03 to +0.03
-            'brightness': random.uniform(-0.03, 0.03),
+            'brightness': rng.uniform(-0.03, 0.03),
 
             # Saturation: 0.97 to 1.03
-            'saturation': random.uniform(0.97, 1.03),
+            'saturation': rng.uniform(0.97, 1.03),
 
             # Contrast: 0.98 to 1.02
-            'contrast': random.uniform(0.98, 1.02),
+            'contrast': rng.uniform(0.98, 1.02),
 
             # Crop: 1-3 pixels from edges
-            'crop_top': random.randint(1, 3),
-            'crop_bottom': random.randint(1, 3),
-            'crop_left': random.randint(1, 3),
-            'crop_right': random.randint(1, 3),
+            'crop_top': rng.randint(1, 3),
+            'crop_bottom': rng.randint(1, 3),
+            'crop_left': rng.randint(1, 3),
+            'crop_right': rng.randint(1, 3),
 
             # Bitrate variation: ±3%
-            'bitrate_factor': random.uniform(0.97, 1.03),
+            'bitrate_factor': rng.uniform(0.97, 1.03),
 
-            # Noise strength: very subtle
-            'noise_strength': random.randint(1, 3),
+            # Corner marker color: 2x2 pixel patch, 24-bit RGB
+            'marker_color': rng.randint(0, 0xFFFFFF),
 
             # Speed: 0.99x to 1.01x
-            'speed': random.uniform(0.99, 1.01),
+            'speed': rng.uniform(0.99, 1.01),
 
             # Starting frame offset: 0-3 frames
-            'frame_offset': random.randint(0, 3),
+            'frame_offset': rng.randint(0, 3),
         }
 
+        # Snap near-unity speeds so the audio track can be copied untouched
+        if abs(params['speed'] - 1.0) < SPEED_COPY_TOLERANCE:
+            params['speed'] = 1.0
+
         logger.debug(f"Generated variation params: {params}")
         return params
 
@@ -188,9 +247,11 @@ class VideoProcessor:
         Returns:
             Filter complex string
         """
-        # Calculate crop dimensions
+        # Calculate crop dimensions (rounded down to even for yuv420p encoders)
         crop_w = width - params['crop_left'] - params['crop_right']
         crop_h = height - params['crop_top'] - params['crop_bottom']
+        crop_w -= crop_w % 2
+        crop_h -= crop_h % 2
 
         # Build filter chain
         filters = []
@@ -200,8 +261,11 @@ class VideoProcessor:
             f"crop={crop_w}:{crop_h}:{params['crop_left']}:{params['crop_top']}"
         )
 
-        # 2. Scale back to original size (subtle quality change)
-        filters.append(f"scale={width}:{height}")
+        # 2. Optionally pad back to original size (no resample pass)
+        if self.preserve_dimensions:
+            filters.append(
+                f"pad={width}:{height}:{params['crop_left']}:{params['crop_top']}"
+            )
 
         # 3. Color adjustments (eq filter)
         filters.append(
@@ -210,8 +274,10 @@ class VideoProcessor:
             f"contrast={params['contrast']}"
         )
 
-        # 4. Add noise
-        filters.append(f"noise=alls={params['noise_strength']}:allf=t")
+        # 4. Paint a seeded 2x2 corner marker (cheaper than full-frame noise)
+        filters.append(
+            f"drawbox=x=0:y=0:w=2:h=2:color=0x{params['marker_color']:06X}:t=fill"
+        )
 
         # 5. Speed adjustment
         filters.append(f"setpts=PTS/{params['speed']}")
@@ -269,6 +335,11 @@ class VideoProcessor:
             if not video_stream:
                 raise VideoProcessorError("No video stream found in file")
 
+            audio_stream = next(
+                (s for s in data['streams'] if s['codec_type'] == 'audio'),
+                None
+            )
+
             # Extract format info
             format_info = data.get('format', {})
 
@@ -280,6 +351,7 @@ class VideoProcessor:
                 'bitrate': int(format_info.get('bit_rate', 0)),
                 'fps': eval(video_stream.get('r_frame_rate', '0/1')),
                 'format': format_info.get('format_name', 'unknown'),
+                'audio_codec': audio_stream.get('codec_name') if audio_stream else None,
             }
 
             logger.info(f"Video info for {path}: {info}")
@@ -294,7 +366,11 @@ class VideoProcessor:
         self,
         input_path: str,
         output_path: str,
-        variation_seed: Optional[int] = None
+        variation_seed: Optional[int] = None,
+        video_info: Optional[Dict] = None,
+        threads: Optional[int] = None,
+        ensure_dir: bool = True,
+        write_metadata: bool = False
     ) -> Dict:
         """
         Process video with all transformations to create a unique variation.
@@ -303,9 +379,18 @@ class VideoProcessor:
             input_path: Path to input video
             output_path: Path to output video
             variation_seed: Optional seed for reproducible variations
+            video_info: Optional pre-fetched input info (skips the ffprobe call)
+            threads: Optional FFmpeg thread count (default: self.threads)
+            ensure_dir: Create the output directory if missing (batch callers
+                create it once up front and pass False)
+            write_metadata: Also write the full processing info (params used,
+                input/output info) to a JSON sidecar, ``{output_path}.json``
+                (default: False)
 
         Returns:
-            Dictionary with processing info (params used, output info, etc.)
+            Dictionary with input/output paths and ``metadata_path``: the
+            sidecar path if one was written (load it with ``load_metadata``),
+            otherwise None.
 
         Raises:
             VideoProcessorError: If processing fails
@@ -317,11 +402,96 @@ class VideoProcessor:
             raise VideoProcessorError(f"Input video not found: {input_path}")
 
         # Create output directory if needed
+        if ensure_dir:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+        # Get video info (batch callers probe the input once and pass it in)
+        if video_info is None:
+            video_info = await self.get_video_info(input_path)
+
+        return await self._encode_variation(
+            ["-i", input_path],
+            input_path,
+            output_path,
+            video_info,
+            variation_seed=variation_seed,
+            threads=threads,
+            write_metadata=write_metadata
+        )
+
+    async def process_video_from_stream(
+        self,
+        stdin: int,
+        output_path: str,
+        video_info: Dict,
+        variation_seed: Optional[int] = None,
+        threads: Optional[int] = None,
+        input_format: str = "matroska",
+        write_metadata: bool = False
+    ) -> Dict:
+        """
+        Process a video read from a pipe instead of a file on disk.
+
+        The stream can't be probed without consuming it, so the caller must
+        pass the source video info (from ``get_video_info`` on the original).
+
+        Args:
+            stdin: Readable file descriptor carrying the input stream
+            output_path: Path to output video
+            video_info: Input video info
+            variation_seed: Optional seed for reproducible variations
+            threads: Optional FFmpeg thread count (default: self.threads)
+            input_format: Container format of the stream (default: matroska)
+            write_metadata: Write a JSON sidecar (see ``process_video``)
+
+        Returns:
+            Same thin result dictionary as ``process_video``
+
+        Raises:
+            VideoProcessorError: If processing fails
+        """
+        logger.info(f"Processing video stream -> {output_path}")
+
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-        # Get video info
-        video_info = await self.get_video_info(input_path)
+        return await self._encode_variation(
+            ["-f", input_format, "-i", "pipe:0"],
+            "pipe:0",
+            output_path,
+            video_info,
+            variation_seed=variation_seed,
+            threads=threads,
+            stdin=stdin,
+            write_metadata=write_metadata
+        )
 
+    async def _encode_variation(
+        self,
+        input_args: List[str],
+        input_label: str,
+        output_path: str,
+        video_info: Dict,
+        variation_seed: Optional[int] = None,
+        threads: Optional[int] = None,
+        stdin: Optional[int] = None,
+        write_metadata: bool = False
+    ) -> Dict:
+        """
+        Encode one variation from the given FFmpeg input.
+
+        Args:
+            input_args: FFmpeg input arguments (``-i`` and any input options)
+            input_label: Input description recorded in the metadata
+            output_path: Path to output video
+            video_info: Input video info
+            variation_seed: Optional seed for reproducible variations
+            threads: Optional FFmpeg thread count (default: self.threads)
+            stdin: Optional file descriptor for FFmpeg's stdin
+            write_metadata: Write the full processing info to a JSON sidecar
+
+        Returns:
+            Thin result dictionary (see ``process_video``)
+        """
         # Generate variation parameters
         params = self._generate_variation_params(variation_seed)
 
@@ -339,40 +509,84 @@ class VideoProcessor:
         # Calculate frame offset in seconds
         frame_offset_seconds = params['frame_offset'] / video_info['fps'] if video_info['fps'] > 0 else 0
 
+        # Copy audio as-is when timing is unchanged and the codec already matches
+        if params['speed'] == 1.0 and video_info.get('audio_codec') == self.audio_codec:
+            audio_args = ["-c:a", "copy"]
+        else:
+            audio_args = ["-c:a", self.audio_codec, "-b:a", "128k"]
+            if params['speed'] != 1.0:
+                # Audio speed (with pitch correction)
+                audio_args = ["-af", f"atempo={params['speed']}"] + audio_args
+
+        # Explicit thread budget: left unset, x264 grabs every core, which
+        # thrashes when several FFmpeg processes run side by side
+        threads = threads or self.threads
+
         # Build FFmpeg arguments
         args = [
-            "-i", input_path,
+            "-filter_threads", str(threads),  # Filter graph threads (global option)
+            *input_args,
             "-ss", str(frame_offset_seconds),  # Start offset
             "-vf", filter_complex,  # Video filters
-            "-af", f"atempo={params['speed']}",  # Audio speed (with pitch correction)
             "-c:v", self.video_codec,  # Video codec
             "-preset", self.preset,  # Encoding preset
             "-crf", str(self.crf),  # Quality
             "-b:v", str(target_bitrate),  # Target bitrate
-            "-c:a", self.audio_codec,  # Audio codec
-            "-b:a", "128k",  # Audio bitrate
+            *audio_args,  # Audio speed/codec
             "-map_metadata", "-1",  # Strip metadata
             "-movflags", "+faststart",  # Enable streaming
-            output_path
         ]
 
-        # Run FFmpeg
-        await self._run_ffmpeg(args, "video processing")
+        if self.tune:
+            args += ["-tune", self.tune]
+
+        args += ["-threads", str(threads)]  # Encoder threads
+
+        args.append(output_path)
 
-        # Get output info
-        output_info = await self.get_video_info(output_path)
+        # Run FFmpeg
+        await self._run_ffmpeg(args, "video processing", stdin=stdin)
+
+        # Keep the returned dict small (it ends up in the Celery result
+        # backend); the full processing info only goes to a sidecar file
+        # when asked for, so throwaway copies don't leave .json files behind
+        metadata_path = None
+        if write_metadata:
+            output_info = await self.get_video_info(output_path)
+            metadata = {
+                'input_path': input_label,
+                'output_path': output_path,
+                'variation_params': params,
+                'input_info': video_info,
+                'output_info': output_info,
+            }
+            metadata_path = f"{output_path}.json"
+            with open(metadata_path, 'w') as f:
+                json.dump(metadata, f)
 
         result = {
-            'input_path': input_path,
+            'input_path': input_label,
             'output_path': output_path,
-            'variation_params': params,
-            'input_info': video_info,
-            'output_info': output_info,
+            'metadata_path': metadata_path,
         }
 
         logger.info(f"Video processing completed: {output_path}")
         return result
 
+    @staticmethod
+    def load_metadata(metadata_path: str) -> Dict:
+        """
+        Load the full processing info written by process_video.
+
+        Args:
+            metadata_path: Path to the JSON sidecar (``result['metadata_path']``)
+
+        Returns:
+            Dictionary with variation params and input/output video info
+        """
+        with open(metadata_path) as f:
+            return json.load(f)
+
     async def strip_metadata(self, input_path: str, output_path: str) -> None:
         """
         Strip all EXIF/metadata from video.
@@ -396,12 +610,94 @@ class VideoProcessor:
             "-map_metadata", "-1",  # Remove all metadata
             "-c:v", "copy",  # Copy video without re-encoding
             "-c:a", "copy",  # Copy audio without re-encoding
+            "-movflags", "+faststart",  # Enable streaming
             output_path
         ]
 
         await self._run_ffmpeg(args, "metadata stripping")
         logger.info(f"Metadata stripped: {output_path}")
 
+    async def strip_and_process(
+        self,
+        input_path: str,
+        output_path: str,
+        variation_seed: Optional[int] = None,
+        threads: Optional[int] = None,
+        write_metadata: bool = False
+    ) -> Dict:
+        """
+        Strip metadata and create a variation in one pipeline.
+
+        The stream-copied, metadata-free source is piped straight into the
+        encoder instead of being written to and re-read from disk.
+
+        Args:
+            input_path: Path to input video
+            output_path: Path to output video
+            variation_seed: Optional seed for reproducible variations
+            threads: Optional FFmpeg thread count for the encoder (default: self.threads)
+            write_metadata: Write a JSON sidecar (see ``process_video``)
+
+        Returns:
+            Same thin result dictionary as ``process_video``
+
+        Raises:
+            VideoProcessorError: If either stage fails
+        """
+        logger.info(f"Stripping and processing video: {input_path} -> {output_path}")
+
+        if not os.path.exists(input_path):
+            raise VideoProcessorError(f"Input video not found: {input_path}")
+
+        self._ensure_ffmpeg()
+        video_info = await self.get_video_info(input_path)
+
+        strip_cmd = [
+            "ffmpeg", "-y",
+            "-i", input_path,
+            "-map_metadata", "-1",  # Remove all metadata
+            "-c", "copy",  # Remux without re-encoding
+            "-f", "matroska",  # Streamable container for the pipe
+            "pipe:1"
+        ]
+        logger.info(f"Running FFmpeg metadata stripping: {' '.join(strip_cmd)}")
+
+        read_fd, write_fd = os.pipe()
+        try:
+            producer = await asyncio.create_subprocess_exec(
+                *strip_cmd,
+                stdout=write_fd,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except Exception as e:
+            os.close(read_fd)
+            raise VideoProcessorError(f"Failed to execute FFmpeg: {str(e)}") from e
+        finally:
+            os.close(write_fd)
+
+        producer_done = asyncio.create_task(producer.communicate())
+        try:
+            result = await self.process_video_from_stream(
+                read_fd,
+                output_path,
+                video_info,
+                variation_seed=variation_seed,
+                threads=threads,
+                write_metadata=write_metadata
+            )
+        finally:
+            # Closing our read end lets the producer exit if the encoder failed
+            os.close(read_fd)
+            _, producer_stderr = await producer_done
+
+        if producer.returncode != 0:
+            error_msg = producer_stderr.decode('utf-8', errors='replace')
+            raise VideoProcessorError(
+                f"FFmpeg metadata stripping failed with code {producer.returncode}: {error_msg}"
+            )
+
+        return result
+
     @staticmethod
     def generate_unique_filename(extension: str = "mp4") -> str:
         """
@@ -418,22 +714,92 @@ class VideoProcessor:
         logger.debug(f"Generated unique filename: {filename}")
         return filename
 
+    async def _process_variation(
+        self,
+        input_path: str,
+        index: int,
+        output_dir: str,
+        semaphore: asyncio.Semaphore,
+        video_info: Dict,
+        threads: int,
+        numbered: bool = False
+    ) -> Dict:
+        """
+        Create a single batch variation once a concurrency slot is free.
+
+        Args:
+            input_path: Path to input video
+            index: Variation index (also used as seed)
+            output_dir: Directory to save the variation (must already exist)
+            semaphore: Semaphore bounding concurrent FFmpeg processes
+            video_info: Pre-fetched input video info
+            threads: FFmpeg thread count for this encode
+            numbered: Seed with index + 1 and name the output
+                variation_<index + 1>_<uuid>, as create_variation does
+
+        Returns:
+            Batch result entry for this variation
+        """
+        async with semaphore:
+            try:
+                # Generate unique filename
+                if numbered:
+                    seed = index + 1
+                    output_filename = f"variation_{seed}_{uuid.uuid4()}.{self.output_format}"
+                else:
+                    seed = index
+                    output_filename = self.generate_unique_filename(self.output_format)
+                output_path = os.path.join(output_dir, output_filename)
+
+                # Process with different seed for each variation
+                result = await self.process_video(
+                    input_path,
+                    output_path,
+                    variation_seed=seed,
+                    video_info=video_info,
+                    threads=threads,
+                    ensure_dir=False
+                )
+
+                return {
+                    'index': index,
+                    'success': True,
+                    'result': result
+                }
+
+            except Exception as e:
+                logger.error(f"Failed to process variation {index}: {str(e)}")
+                return {
+                    'index': index,
+                    'success': False,
+                    'error': str(e)
+                }
+
     async def batch_process(
         self,
         input_path: str,
         count: int,
-        output_dir: str
+        output_dir: str,
+        max_parallel: Optional[int] = None,
+        numbered: bool = False
     ) -> List[Dict]:
         """
         Create multiple unique variations of a video.
 
+        Variations are encoded concurrently, bounded by ``max_parallel``
+        FFmpeg processes that split the available CPU cores between them.
+
         Args:
             input_path: Path to input video
             count: Number of variations to create
             output_dir: Directory to save variations
+            max_parallel: Maximum concurrent FFmpeg processes
+                (default: half the CPU cores, at least 1)
+            numbered: Seed and name each output like
+                create_variation(variation_number=index + 1)
 
         Returns:
-            List of processing results for each variation
+            List of processing results for each variation, in index order
 
         Raises:
             VideoProcessorError: If batch processing fails
@@ -445,41 +811,31 @@ class VideoProcessor:
 
         os.makedirs(output_dir, exist_ok=True)
 
-        results = []
+        cpu_count = os.cpu_count() or 1
+        if max_parallel is None:
+            max_parallel = cpu_count // 2
+        max_parallel = max(1, min(max_parallel, count))
+        threads = max(1, cpu_count // max_parallel)
 
-        for i in range(count):
-            try:
-                # Generate unique filename
-                output_filename = self.generate_unique_filename(self.output_format)
-                output_path = os.path.join(output_dir, output_filename)
+        # Probe the input once and share it across all variations
+        video_info = await self.get_video_info(input_path)
 
-                # Process with different seed for each variation
-                result = await self.process_video(
-                    input_path,
-                    output_path,
-                    variation_seed=i
+        semaphore = asyncio.Semaphore(max_parallel)
+        tasks = [
+            asyncio.create_task(
+                self._process_variation(
+                    input_path, i, output_dir, semaphore, video_info, threads,
+                    numbered
                 )
-
-                results.append({
-                    'index': i,
-                    'success': True,
-                    'result': result
-                })
-
-                logger.info(f"Batch progress: {i+1}/{count} completed")
-
-            except Exception as e:
-                logger.error(f"Failed to process variation {i}: {str(e)}")
-                results.append({
-                    'index': i,
-                    'success': False,
-                    'error': str(e)
-                })
+            )
+            for i in range(count)
+        ]
+        results = await asyncio.gather(*tasks)
 
         successful = sum(1 for r in results if r['success'])
         logger.info(f"Batch processing completed: {successful}/{count} successful")
 
-        return results
+        return list(results)
 
     async def verify_unique_hashes(self, file_paths: List[str]) -> Dict:
         """
@@ -491,8 +847,6 @@ class VideoProcessor:
         Returns:
             Dictionary with hash analysis results
         """
-        import hashlib
-
         logger.info(f"Verifying unique hashes for {len(file_paths)} files")
 
         hashes = {}
@@ -503,11 +857,13 @@ class VideoProcessor:
                 logger.warning(f"File not found for hash check: {path}")
                 continue
 
-            # Calculate MD5 hash
+            # Calculate MD5 hash over a read-only mapping (one update call,
+            # no Python-side chunk loop); empty files can't be mapped
             md5_hash = hashlib.md5()
             with open(path, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b''):
-                    md5_hash.update(chunk)
+                if os.fstat(f.fileno()).st_size > 0:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        md5_hash.update(mm)
 
             file_hash = md5_hash.hexdigest()
 
@@ -543,8 +899,6 @@ class VideoProcessor:
         Returns:
             Path to the created unique video file
         """
-        import asyncio
-
         # Generate output path
         output_dir = os.path.join(os.path.dirname(input_path), "temp")
         os.makedirs(output_dir, exist_ok=True)
@@ -557,14 +911,7 @@ class VideoProcessor:
         output_path = os.path.join(output_dir, output_filename)
 
         # Run async process in sync context
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(
-                self.process_video(input_path, output_path, variation_seed=job_id)
-            )
-        finally:
-            loop.close()
+        asyncio.run(self.process_video(input_path, output_path, variation_seed=job_id))
 
         return output_path
 
@@ -579,8 +926,6 @@ class VideoProcessor:
         Returns:
             Path to the created variation file
         """
-        import asyncio
-
         # Generate output path
         output_dir = os.path.join(os.path.dirname(video_path), "variations")
         os.makedirs(output_dir, exist_ok=True)
@@ -589,13 +934,6 @@ class VideoProcessor:
         output_path = os.path.join(output_dir, output_filename)
 
         # Run async process in sync context
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(
-                self.process_video(video_path, output_path, variation_seed=variation_number)
-            )
-        finally:
-            loop.close()
+        asyncio.run(self.process_video(video_path, output_path, variation_seed=variation_number))
 
         return output_path
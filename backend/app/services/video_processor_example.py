@@ -35,13 +35,16 @@ async def example_single_process():
         result = await processor.process_video(
             input_path=input_video,
             output_path=output_video,
-            variation_seed=42  # Use seed for reproducible result
+            variation_seed=42,  # Use seed for reproducible result
+            write_metadata=True  # Keep the processing info for the logs below
         )
 
+        metadata = processor.load_metadata(result['metadata_path'])
+
         logger.info(f"Processing completed!")
-        logger.info(f"Input duration: {result['input_info']['duration']}s")
-        logger.info(f"Output duration: {result['output_info']['duration']}s")
-        logger.info(f"Variation params: {result['variation_params']}")
+        logger.info(f"Input duration: {metadata['input_info']['duration']}s")
+        logger.info(f"Output duration: {metadata['output_info']['duration']}s")
+        logger.info(f"Variation params: {metadata['variation_params']}")
 
     except VideoProcessorError as e:
         logger.error(f"Processing failed: {e}")
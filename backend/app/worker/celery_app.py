@@ -7,11 +7,50 @@ and result backend, along with task serialization, time limits, and retry polici
 
 import os
 from celery import Celery
-from kombu import serialization
+from kombu import Queue, serialization
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 # Get Redis URL from environment or use default
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+# Worker sizing (the --concurrency/--prefetch-multiplier CLI flags still win).
+# Tasks are long and I/O-bound, so never reserve more than one per process
+# by default; concurrency defaults to the CPU count when unset.
+WORKER_PREFETCH_MULTIPLIER = int(os.getenv("CELERY_WORKER_PREFETCH_MULTIPLIER", "1"))
+WORKER_CONCURRENCY = int(os.getenv("CELERY_WORKER_CONCURRENCY", "0")) or None
+
+# Prefer orjson for task/result payloads (much faster than stdlib json on
+# the large nested batch results); plain json stays accepted so messages
+# from producers without orjson still decode.
+if orjson is not None:
+    serialization.register(
+        "orjson",
+        orjson.dumps,
+        orjson.loads,
+        content_type="application/x-orjson",
+        content_encoding="utf-8",
+    )
+    TASK_SERIALIZER = "orjson"
+else:
+    TASK_SERIALIZER = "json"
+
+# Compress task and result bodies with zstd when it's installed. Set
+# CELERY_COMPRESSION to an empty string to publish raw messages (e.g. to read
+# them with redis-cli); every worker must be able to decompress what
+# producers send, so keep this consistent across the deployment.
+COMPRESSION = os.getenv(
+    "CELERY_COMPRESSION", "zstd" if zstandard is not None else ""
+) or None
+
 # Initialize Celery app
 celery_app = Celery(
     "tiktok_autoposter",
@@ -23,9 +62,12 @@ celery_app = Celery(
 # Celery Configuration
 celery_app.conf.update(
     # Task serialization
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    task_serializer=TASK_SERIALIZER,
+    accept_content=["orjson", "json"],
+    result_serializer=TASK_SERIALIZER,
+    result_accept_content=["orjson", "json"],
+    task_compression=COMPRESSION,
+    result_compression=COMPRESSION,
     timezone="UTC",
     enable_utc=True,
 
@@ -35,6 +77,9 @@ celery_app.conf.update(
     task_soft_time_limit=1500,  # 25 minutes soft limit
 
     # Task result settings
+    # Job/account/proxy state lives in the database, so most results are never
+    # read; tasks whose results are consumed opt back in with ignore_result=False
+    task_ignore_result=True,
     result_expires=3600,  # Results expire after 1 hour
     result_backend_transport_options={
         "master_name": "mymaster",
@@ -42,7 +87,8 @@ celery_app.conf.update(
     },
 
     # Worker settings
-    worker_prefetch_multiplier=1,  # One task at a time per worker
+    worker_prefetch_multiplier=WORKER_PREFETCH_MULTIPLIER,  # One task at a time per worker
+    worker_concurrency=WORKER_CONCURRENCY,
     worker_max_tasks_per_child=50,  # Restart worker after 50 tasks
     worker_disable_rate_limits=False,
 
@@ -56,6 +102,9 @@ celery_app.conf.update(
     broker_connection_retry=True,
     broker_connection_retry_on_startup=True,
     broker_connection_max_retries=10,
+    broker_transport_options={
+        "socket_keepalive": True,  # Keep long-lived producer connections alive
+    },
 
     # Rate limiting
     task_annotations={
@@ -68,19 +117,48 @@ celery_app.conf.update(
         "app.worker.tasks.check_proxy_task": {
             "rate_limit": "60/m",  # 60 proxy checks per minute
         },
+        "app.worker.tasks.batch_process_video_task": {
+            "rate_limit": None,  # Bounded by processing worker concurrency instead
+        },
+        "app.worker.tasks.make_variation_task": {
+            "rate_limit": None,
+        },
     },
 
+    # Queues, by workload class, so each can get a worker sized for it:
+    # uploads/processing/campaigns run for minutes, tests for seconds, maint
+    # is periodic housekeeping. Declaring them means a worker started
+    # without -Q consumes all of them.
+    task_default_queue="celery",
+    task_queues=(
+        Queue("celery"),
+        Queue("uploads"),
+        Queue("campaigns"),
+        Queue("processing"),
+        Queue("tests"),
+        Queue("maint"),
+    ),
+
     # Task routes (can be used to route tasks to specific queues)
     task_routes={
         "app.worker.tasks.upload_video_task": {"queue": "uploads"},
         "app.worker.tasks.start_campaign_task": {"queue": "campaigns"},
         "app.worker.tasks.test_account_task": {"queue": "tests"},
         "app.worker.tasks.check_proxy_task": {"queue": "tests"},
+        "app.worker.tasks.record_proxy_checks_task": {"queue": "tests"},
         "app.worker.tasks.batch_process_video_task": {"queue": "processing"},
+        "app.worker.tasks.make_variation_task": {"queue": "processing"},
+        "app.worker.tasks.cleanup_old_jobs_task": {"queue": "maint"},
+        "app.worker.tasks.cleanup_temp_videos_task": {"queue": "maint"},
     },
 
     # Beat schedule (for periodic tasks if needed)
     beat_schedule={
+        # Sweep temp videos left behind by crashed or killed upload tasks
+        "cleanup-temp-videos": {
+            "task": "app.worker.tasks.cleanup_temp_videos_task",
+            "schedule": 300.0,
+        },
         # Example: Check all proxies every hour
         # "check-all-proxies": {
         #     "task": "app.worker.tasks.check_all_proxies_task",
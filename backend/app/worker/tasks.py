@@ -5,21 +5,26 @@ This module contains all Celery tasks for video uploading, campaign management,
 account testing, proxy checking, and video processing.
 """
 
+import hashlib
+import json
 import logging
 import os
-import shutil
 import time
 import random
 import asyncio
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from celery import Task
+from typing import Optional, Dict, Any, List, Tuple
+from celery import Task, chord, group
 from celery.exceptions import SoftTimeLimitExceeded, Retry
-from sqlalchemy import select
+from celery.signals import worker_process_init, worker_process_shutdown
+from sqlalchemy import case, delete, insert, literal, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.worker.celery_app import celery_app
-from app.database import async_session_maker
+from app.database import async_session_maker, engine
 from app.config import settings
 from app.models.job import Job, JobStatus
 from app.models.campaign import Campaign, CampaignStatus
@@ -27,27 +32,156 @@ from app.models.account import Account, AccountStatus
 from app.models.proxy import Proxy, ProxyStatus
 from app.models.profile import BrowserProfile
 
+# The API process imports this module to enqueue tasks, so the services
+# (Playwright, requests, the video stack) are imported inside the task
+# bodies and only loaded by workers.
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# How long a proxy probe result is reused for identical proxies (seconds)
+PROXY_CHECK_CACHE_TTL = 60
+
+# How long a cookie validity result is reused for the same account (seconds)
+ACCOUNT_AUTH_CACHE_TTL = 300
+
+# Threads available to asyncio.to_thread() calls (browser, FFmpeg, proxy probes)
+WORKER_IO_THREADS = int(os.getenv("WORKER_IO_THREADS", "8"))
+
+# Upload errors (lowercase substrings) that retrying cannot fix
+PERMANENT_UPLOAD_ERRORS = (
+    "not logged in",
+    "invalid cookies",
+    "cookies file not found",
+    "video file not found",
+    "video rejected",
+)
+
+
+class TransientUploadError(Exception):
+    """Upload failure that may succeed on retry (network, browser, timeouts)."""
+    pass
+
+
+class PermanentUploadError(Exception):
+    """Upload failure that will not succeed on retry (bad cookies, rejected video)."""
+    pass
+
+
+# One event loop per worker process, running in a background thread. Tasks
+# schedule their coroutines onto it so the async DB engine's connection pool
+# survives between tasks instead of being rebuilt on a fresh loop each time.
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_THREAD: Optional[threading.Thread] = None
+_LOOP_LOCK = threading.Lock()
+_IO_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+# Connection dicts built by _proxy_to_dict, keyed by (proxy id, updated_at)
+PROXY_DICT_CACHE_SIZE = 1024
+_PROXY_DICTS: Dict[tuple, Dict[str, Any]] = {}
+
+# Parsed cookie lists and their digests, keyed by (account id, updated_at)
+ACCOUNT_COOKIES_CACHE_SIZE = 512
+_ACCOUNT_COOKIES: Dict[tuple, Tuple[List[Dict[str, Any]], str]] = {}
+
+# Per-process VideoProcessor, created once (it probes FFmpeg on construction)
+_VIDEO_PROCESSOR = None
+
+
+def _start_loop() -> asyncio.AbstractEventLoop:
+    """Return the worker's event loop, starting it if needed."""
+    global _LOOP, _LOOP_THREAD, _IO_EXECUTOR
+    with _LOOP_LOCK:
+        if _LOOP is None or _LOOP_THREAD is None or not _LOOP_THREAD.is_alive():
+            loop = asyncio.new_event_loop()
+            # Bounded, named pool for to_thread() instead of the default executor
+            _IO_EXECUTOR = ThreadPoolExecutor(
+                max_workers=WORKER_IO_THREADS,
+                thread_name_prefix="tiktok-io"
+            )
+            loop.set_default_executor(_IO_EXECUTOR)
+            thread = threading.Thread(
+                target=loop.run_forever,
+                name="celery-asyncio",
+                daemon=True
+            )
+            thread.start()
+            _LOOP, _LOOP_THREAD = loop, thread
+        return _LOOP
+
+
+@worker_process_init.connect
+def _init_worker_loop(**kwargs) -> None:
+    """Start a fresh event loop in each forked worker process."""
+    global _LOOP, _LOOP_THREAD, _IO_EXECUTOR
+    # A loop and pool inherited from the parent have no threads after fork
+    _LOOP = _LOOP_THREAD = _IO_EXECUTOR = None
+    _start_loop()
+
+    from app.services.video_processor import VideoProcessorError
+
+    # Warm the video processor so the first job doesn't pay the FFmpeg probe
+    try:
+        _get_video_processor()
+    except VideoProcessorError as e:
+        logger.warning(f"Video processor unavailable in this worker: {e}")
+
+
+def _get_video_processor():
+    """Return the worker's shared VideoProcessor, creating it on first use."""
+    global _VIDEO_PROCESSOR
+    if _VIDEO_PROCESSOR is None:
+        from app.services.video_processor import VideoProcessor
+        _VIDEO_PROCESSOR = VideoProcessor()
+    return _VIDEO_PROCESSOR
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_loop(**kwargs) -> None:
+    """Close pooled DB connections and stop the worker's event loop."""
+    global _LOOP, _LOOP_THREAD, _IO_EXECUTOR
+    with _LOOP_LOCK:
+        loop, thread, executor = _LOOP, _LOOP_THREAD, _IO_EXECUTOR
+        _LOOP = _LOOP_THREAD = _IO_EXECUTOR = None
+
+    if loop is None:
+        return
+
+    try:
+        asyncio.run_coroutine_threadsafe(engine.dispose(), loop).result(timeout=10)
+    except Exception as e:
+        logger.warning(f"Failed to dispose database engine: {e}")
+
+    loop.call_soon_threadsafe(loop.stop)
+    if thread is not None:
+        thread.join(timeout=5)
+    if not loop.is_running():
+        loop.close()
+    if executor is not None:
+        executor.shutdown(wait=False)
+
 
 def run_async(coro):
-    """Helper function to run async code in sync context."""
-    loop = asyncio.get_event_loop()
-    if loop.is_running():
-        # If there's already a running loop, create a new one
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    return loop.run_until_complete(coro)
+    """Run a coroutine on the worker's persistent event loop and wait for it."""
+    future = asyncio.run_coroutine_threadsafe(coro, _start_loop())
+    try:
+        return future.result()
+    except SoftTimeLimitExceeded:
+        # The soft limit is raised in this (the task's) thread; cancel the
+        # coroutine so its own failure handling runs on the loop
+        future.cancel()
+        raise
 
 
 @celery_app.task(
     bind=True,
-    autoretry_for=(Exception,),
+    autoretry_for=(TransientUploadError,),
+    dont_autoretry_for=(PermanentUploadError, ValueError),
     retry_kwargs={'max_retries': 3, 'countdown': 5},
     retry_backoff=True,
     retry_backoff_max=600,
     retry_jitter=True,
+    ignore_result=False,  # Collected by callers that wait on uploads
     name="app.worker.tasks.upload_video_task"
 )
 def upload_video_task(self, job_id: int) -> Dict[str, Any]:
@@ -61,7 +195,8 @@ def upload_video_task(self, job_id: int) -> Dict[str, Any]:
         Dictionary with upload results
 
     Raises:
-        Retry: If the upload fails and should be retried
+        TransientUploadError: If the upload fails and should be retried
+        PermanentUploadError: If the upload fails and retrying cannot help
     """
     return run_async(_upload_video_task_async(self, job_id))
 
@@ -69,138 +204,178 @@ def upload_video_task(self, job_id: int) -> Dict[str, Any]:
 async def _upload_video_task_async(task_self, job_id: int) -> Dict[str, Any]:
     """Async implementation of upload_video_task."""
     temp_video_path = None
+    job = None
 
     async with async_session_maker() as db:
         try:
             logger.info(f"Starting upload task for job_id={job_id}")
 
-            # Fetch job from database
-            result = await db.execute(select(Job).where(Job.id == job_id))
-            job = result.scalar_one_or_none()
+            # Fetch job with its account, proxy, profile and campaign in one
+            # round-trip (outer joins so missing rows can be reported)
+            result = await db.execute(
+                select(Job, Account, Proxy, BrowserProfile, Campaign)
+                .outerjoin(Account, Account.id == Job.account_id)
+                .outerjoin(Proxy, Proxy.id == Account.proxy_id)
+                .outerjoin(BrowserProfile, BrowserProfile.id == Account.profile_id)
+                .outerjoin(Campaign, Campaign.id == Job.campaign_id)
+                .where(Job.id == job_id)
+            )
+            row = result.one_or_none()
 
-            if not job:
+            if not row:
                 logger.error(f"Job {job_id} not found")
-                raise ValueError(f"Job {job_id} not found")
+                raise PermanentUploadError(f"Job {job_id} not found")
 
-            # Update job status to running
-            job.status = JobStatus.RUNNING
-            job.started_at = datetime.utcnow()
-            await db.commit()
-
-            # Get associated account
-            result = await db.execute(select(Account).where(Account.id == job.account_id))
-            account = result.scalar_one_or_none()
+            job, account, proxy, profile, campaign = row
 
+            # Validate before marking the job running, so a job that cannot
+            # run is written once (as failed) rather than twice
             if not account:
-                raise ValueError(f"Account {job.account_id} not found")
+                raise PermanentUploadError(f"Account {job.account_id} not found")
 
-            # Get proxy if assigned
-            proxy = None
-            if account.proxy_id:
-                result = await db.execute(select(Proxy).where(Proxy.id == account.proxy_id))
-                proxy = result.scalar_one_or_none()
-
-            # Get browser profile if assigned
-            profile = None
-            if account.profile_id:
-                result = await db.execute(select(BrowserProfile).where(BrowserProfile.id == account.profile_id))
-                profile = result.scalar_one_or_none()
+            if not campaign:
+                raise PermanentUploadError(f"Campaign {job.campaign_id} not found")
 
-            # Get campaign for video details
-            result = await db.execute(select(Campaign).where(Campaign.id == job.campaign_id))
-            campaign = result.scalar_one_or_none()
+            # Fail before paying for the encode if the account cannot log in
+            cookies, _ = _account_cookies(account)
+            if not cookies:
+                raise PermanentUploadError(f"Account {account.id} has no cookies")
 
-            if not campaign:
-                raise ValueError(f"Campaign {job.campaign_id} not found")
+            # Update job status to running; committed now so progress is
+            # visible while the encode and upload run
+            await _update_job(db, job_id, status=JobStatus.RUNNING, started_at=datetime.utcnow())
 
             # Process video (create unique copy)
             logger.info(f"Processing video for job {job_id}")
-            from app.services.video_processor import VideoProcessor
-            video_processor = VideoProcessor()
-
-            temp_video_path = video_processor.create_unique_copy(
+            video_processor = _get_video_processor()
+
+            # Encode on this worker's loop (FFmpeg runs as an async
+            # subprocess). The path is set first so the finally block also
+            # removes a partial file if the encode fails
+            temp_video_path = os.path.join(
+                os.path.dirname(campaign.video_path),
+                "temp",
+                f"job_{job_id}_{uuid.uuid4()}.{video_processor.output_format}"
+            )
+            await video_processor.process_video(
                 campaign.video_path,
-                job_id=job_id
+                temp_video_path,
+                variation_seed=job_id
             )
 
+            # Prepare upload parameters from job and campaign
+            upload_params = {
+                "video_path": temp_video_path,
+                "caption": job.caption,
+            }
+
             # Initialize TikTok uploader
             logger.info(f"Initializing TikTok uploader for account {account.email}")
             from app.services.tiktok_uploader import TikTokUploader
             uploader = TikTokUploader(
-                cookies=account.cookies,
+                cookies=cookies,
                 proxy=_proxy_to_dict(proxy) if proxy else None,
                 headless=settings.tiktok_headless
             )
 
-            # Prepare upload parameters from job and campaign
-            upload_params = {
-                "video_path": temp_video_path,
-                "caption": job.caption,
-            }
-
             # Upload video
             logger.info(f"Uploading video for job {job_id}")
             upload_result = await asyncio.to_thread(uploader.upload_video, **upload_params)
 
             # Update job with results
-            if upload_result.get("success"):
-                job.status = JobStatus.COMPLETED
-                job.completed_at = datetime.utcnow()
-                account.last_used = datetime.utcnow()
-                logger.info(f"Job {job_id} completed successfully")
-            else:
-                job.status = JobStatus.FAILED
-                job.error_message = upload_result.get("error", "Unknown error")
-                job.completed_at = datetime.utcnow()
-                logger.error(f"Job {job_id} failed: {job.error_message}")
-
-            await db.commit()
+            if not upload_result.get("success"):
+                error = upload_result.get("error") or "Unknown error"
+                if any(marker in error.lower() for marker in PERMANENT_UPLOAD_ERRORS):
+                    raise PermanentUploadError(error)
+                raise TransientUploadError(error)
+
+            now = datetime.utcnow()
+            await db.execute(
+                update(Account)
+                .where(Account.id == account.id)
+                .values(last_used=now)
+                .execution_options(synchronize_session=False)
+            )
+            await _update_job(db, job_id, status=JobStatus.COMPLETED, completed_at=now)
+            logger.info(f"Job {job_id} completed successfully")
 
             return {
                 "job_id": job_id,
-                "status": job.status.value,
+                "status": JobStatus.COMPLETED.value,
                 "error": job.error_message
             }
 
-        except SoftTimeLimitExceeded:
+        except (SoftTimeLimitExceeded, asyncio.CancelledError):
+            # run_async cancels the coroutine when the soft time limit hits
             logger.error(f"Job {job_id} exceeded time limit")
-            job.status = JobStatus.FAILED
-            job.error_message = "Task exceeded time limit"
-            job.completed_at = datetime.utcnow()
-            await db.commit()
+            if job is not None:
+                await db.rollback()
+                await _update_job(
+                    db, job_id,
+                    status=JobStatus.FAILED,
+                    error_message="Task exceeded time limit",
+                    completed_at=datetime.utcnow()
+                )
             raise
 
-        except Exception as e:
-            logger.exception(f"Error processing job {job_id}: {str(e)}")
+        except (PermanentUploadError, ValueError) as e:
+            logger.error(f"Job {job_id} failed permanently: {str(e)}")
+
+            # Not retried, so the job is finished; rollback clears any
+            # half-applied changes first
+            if job is not None:
+                await db.rollback()
+                await _update_job(
+                    db, job_id,
+                    status=JobStatus.FAILED,
+                    error_message=str(e),
+                    completed_at=datetime.utcnow()
+                )
 
-            # Update job status
-            result = await db.execute(select(Job).where(Job.id == job_id))
-            job = result.scalar_one_or_none()
+            raise
 
-            if job:
-                job.retry_count = (job.retry_count or 0) + 1
+        except Exception as e:
+            logger.exception(f"Error processing job {job_id}: {str(e)}")
 
-                if job.retry_count >= job.max_retries:
-                    job.status = JobStatus.FAILED
-                    job.error_message = f"Max retries exceeded: {str(e)}"
-                    job.completed_at = datetime.utcnow()
-                    await db.commit()
+            # Update the job loaded above; read its counters before rollback
+            # expires it so no reload is needed
+            if job is not None:
+                retry_count = (job.retry_count or 0) + 1
+                max_retries = job.max_retries
+                await db.rollback()
+
+                if retry_count >= max_retries:
+                    await _update_job(
+                        db, job_id,
+                        status=JobStatus.FAILED,
+                        retry_count=retry_count,
+                        error_message=f"Max retries exceeded: {str(e)}",
+                        completed_at=datetime.utcnow()
+                    )
                     logger.error(f"Job {job_id} failed after max retries")
                 else:
-                    job.status = JobStatus.RETRYING
-                    job.error_message = f"Retry {job.retry_count}/{job.max_retries}: {str(e)}"
-                    await db.commit()
-                    logger.info(f"Job {job_id} will retry (attempt {job.retry_count}/{job.max_retries})")
+                    await _update_job(
+                        db, job_id,
+                        status=JobStatus.RETRYING,
+                        retry_count=retry_count,
+                        error_message=f"Retry {retry_count}/{max_retries}: {str(e)}"
+                    )
+                    logger.info(f"Job {job_id} will retry (attempt {retry_count}/{max_retries})")
 
-            raise
+            # Anything unclassified (browser crash, network, FFmpeg) is retried
+            if isinstance(e, TransientUploadError):
+                raise
+            raise TransientUploadError(str(e)) from e
 
         finally:
-            # Clean up temporary files
-            if temp_video_path and os.path.exists(temp_video_path):
+            # Clean up the temporary video; anything left behind is swept by
+            # cleanup_temp_videos_task
+            if temp_video_path:
                 try:
-                    os.remove(temp_video_path)
-                    logger.info(f"Cleaned up temporary file: {temp_video_path}")
-                except Exception as e:
+                    os.unlink(temp_video_path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
                     logger.warning(f"Failed to clean up temp file {temp_video_path}: {e}")
 
 
@@ -228,88 +403,98 @@ async def _start_campaign_task_async(task_self, campaign_id: int, account_ids: l
         try:
             logger.info(f"Starting campaign {campaign_id}")
 
-            # Fetch campaign
-            result = await db.execute(select(Campaign).where(Campaign.id == campaign_id))
-            campaign = result.scalar_one_or_none()
+            # Fetch campaign and selected accounts in one round-trip; the outer
+            # join yields a single (campaign, None) row when no account matches
+            result = await db.execute(
+                select(Campaign, Account)
+                .outerjoin(Account, Account.id.in_(account_ids))
+                .where(Campaign.id == campaign_id)
+            )
+            rows = result.all()
 
-            if not campaign:
+            if not rows:
                 raise ValueError(f"Campaign {campaign_id} not found")
 
-            # Update campaign status
+            campaign = rows[0][0]
+            accounts = [account for _, account in rows if account is not None]
+
+            # Update campaign status (committed together with the jobs below)
             campaign.status = CampaignStatus.RUNNING
             campaign.started_at = datetime.utcnow()
-            await db.commit()
-
-            # Get selected accounts
-            result = await db.execute(
-                select(Account).where(Account.id.in_(account_ids))
-            )
-            accounts = result.scalars().all()
 
             if not accounts:
                 raise ValueError(f"No accounts found for campaign {campaign_id}")
 
-            # Get available active proxies
-            result = await db.execute(
-                select(Proxy).where(Proxy.status == ProxyStatus.ACTIVE)
-            )
-            proxies = result.scalars().all()
-
             # Parse schedule configuration
             schedule_config = campaign.schedule
             time_range_minutes = schedule_config.get("interval_minutes", 0)
             account_count = len(accounts)
 
-            jobs_created = []
+            # Calculate the upload delay for each account
+            if time_range_minutes > 0 and account_count > 1:
+                # Distribute uploads evenly across the time range, with some
+                # randomness (±10%)
+                step = time_range_minutes * 60 / (account_count - 1)
+                uniform = random.uniform
+                delays = [
+                    max(0.0, step * idx * (1 + uniform(-0.1, 0.1)))
+                    for idx in range(account_count)
+                ]
+            else:
+                # Add small random delay to avoid simultaneous uploads
+                delays = [random.uniform(0, 30) for _ in range(account_count)]
 
-            # Create jobs for each account
-            for idx, account in enumerate(accounts):
-                # Calculate delay for this job
-                if time_range_minutes > 0 and account_count > 1:
-                    # Distribute uploads across the time range
-                    max_delay_seconds = time_range_minutes * 60
-                    delay_seconds = (max_delay_seconds / (account_count - 1)) * idx
-                    # Add some randomness (±10%)
-                    jitter = random.uniform(-0.1, 0.1) * delay_seconds
-                    delay_seconds = max(0, delay_seconds + jitter)
-                else:
-                    # Add small random delay to avoid simultaneous uploads
-                    delay_seconds = random.uniform(0, 30)
-
-                # Create job
-                job = Job(
-                    campaign_id=campaign_id,
-                    account_id=account.id,
-                    status=JobStatus.PENDING,
-                    video_path=campaign.video_path,
-                    caption=campaign.caption_template,
-                    retry_count=0,
-                    max_retries=3,
-                    created_at=datetime.utcnow()
-                )
+            # Create all jobs in a single INSERT ... RETURNING
+            now = datetime.utcnow()
+            result = await db.execute(
+                insert(Job).returning(Job.id, Job.account_id),
+                [
+                    {
+                        "campaign_id": campaign_id,
+                        "account_id": account.id,
+                        "status": JobStatus.PENDING,
+                        "video_path": campaign.video_path,
+                        "caption": campaign.caption_template,
+                        "retry_count": 0,
+                        "max_retries": 3,
+                        "created_at": now,
+                    }
+                    for account in accounts
+                ]
+            )
+            job_ids = {account_id: job_id for job_id, account_id in result.all()}
 
-                db.add(job)
-                await db.flush()
+            # Commit before scheduling so workers can always see the jobs
+            await db.commit()
 
-                # Schedule the upload task
-                upload_video_task.apply_async(
-                    args=[job.id],
-                    countdown=int(delay_seconds)
+            jobs_created = []
+            signatures = []
+
+            # Build the upload task for each job
+            for account, delay_seconds in zip(accounts, delays):
+                job_id = job_ids[account.id]
+
+                signatures.append(
+                    upload_video_task.signature(
+                        args=[job_id],
+                        countdown=int(delay_seconds)
+                    )
                 )
 
                 jobs_created.append({
-                    "job_id": job.id,
+                    "job_id": job_id,
                     "account_id": account.id,
                     "account_email": account.email,
                     "delay_seconds": delay_seconds,
                 })
 
                 logger.info(
-                    f"Created job {job.id} for account {account.email} "
+                    f"Created job {job_id} for account {account.email} "
                     f"with {delay_seconds:.0f}s delay"
                 )
 
-            await db.commit()
+            # Schedule all uploads over one broker connection
+            group(signatures).apply_async()
 
             logger.info(f"Campaign {campaign_id} started with {len(jobs_created)} jobs")
 
@@ -323,12 +508,14 @@ async def _start_campaign_task_async(task_self, campaign_id: int, account_ids: l
             logger.exception(f"Error starting campaign {campaign_id}: {str(e)}")
 
             # Update campaign status to cancelled
-            result = await db.execute(select(Campaign).where(Campaign.id == campaign_id))
-            campaign = result.scalar_one_or_none()
-
-            if campaign:
-                campaign.status = CampaignStatus.CANCELLED
-                await db.commit()
+            await db.rollback()
+            await db.execute(
+                update(Campaign)
+                .where(Campaign.id == campaign_id)
+                .values(status=CampaignStatus.CANCELLED)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
 
             raise
 
@@ -337,6 +524,8 @@ async def _start_campaign_task_async(task_self, campaign_id: int, account_ids: l
     bind=True,
     autoretry_for=(Exception,),
     retry_kwargs={'max_retries': 2, 'countdown': 10},
+    retry_backoff=True,
+    retry_jitter=True,
     name="app.worker.tasks.test_account_task"
 )
 def test_account_task(self, account_id: int) -> Dict[str, Any]:
@@ -365,15 +554,25 @@ async def _test_account_task_async(task_self, account_id: int) -> Dict[str, Any]
             if not account:
                 raise ValueError(f"Account {account_id} not found")
 
-            # Initialize uploader to test cookies
-            from app.services.tiktok_uploader import TikTokUploader
-            uploader = TikTokUploader(
-                cookies=account.cookies,
-                headless=settings.tiktok_headless
-            )
+            # Reuse a recent result for the same cookies instead of starting
+            # another browser session
+            cookies, cookies_digest = _account_cookies(account)
+            cache_key = f"acct_auth:{account_id}:{cookies_digest}"
+            is_valid = await _cache_get(cache_key)
+
+            if is_valid is None:
+                # Initialize uploader to test cookies
+                from app.services.tiktok_uploader import TikTokUploader
+                uploader = TikTokUploader(
+                    cookies=cookies,
+                    headless=settings.tiktok_headless
+                )
 
-            # Test authentication
-            is_valid = await asyncio.to_thread(uploader.test_authentication)
+                # Test authentication
+                is_valid = await asyncio.to_thread(uploader.test_authentication)
+                await _cache_set(cache_key, bool(is_valid), ACCOUNT_AUTH_CACHE_TTL)
+            else:
+                logger.info(f"Using cached authentication result for account {account_id}")
 
             # Update account status
             if is_valid:
@@ -396,12 +595,14 @@ async def _test_account_task_async(task_self, account_id: int) -> Dict[str, Any]
             logger.exception(f"Error testing account {account_id}: {str(e)}")
 
             # Mark account as inactive
-            result = await db.execute(select(Account).where(Account.id == account_id))
-            account = result.scalar_one_or_none()
-
-            if account:
-                account.status = AccountStatus.INACTIVE
-                await db.commit()
+            await db.rollback()
+            await db.execute(
+                update(Account)
+                .where(Account.id == account_id)
+                .values(status=AccountStatus.INACTIVE)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
 
             raise
 
@@ -410,23 +611,53 @@ async def _test_account_task_async(task_self, account_id: int) -> Dict[str, Any]
     bind=True,
     autoretry_for=(Exception,),
     retry_kwargs={'max_retries': 2, 'countdown': 5},
+    retry_backoff=True,
+    retry_jitter=True,
+    ignore_result=False,  # Chord header for check_all_proxies_task
     name="app.worker.tasks.check_proxy_task"
 )
-def check_proxy_task(self, proxy_id: int) -> Dict[str, Any]:
+def check_proxy_task(
+    self,
+    proxy_id: int,
+    proxy_dict: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """
     Test proxy connectivity and latency.
 
     Args:
         proxy_id: The ID of the proxy to check
+        proxy_dict: Connection details from _proxy_to_dict. When given, the
+            proxy is not loaded or updated here; the result is returned for
+            record_proxy_checks_task to store in bulk.
 
     Returns:
         Dictionary with proxy check results
     """
-    return run_async(_check_proxy_task_async(self, proxy_id))
+    return run_async(_check_proxy_task_async(self, proxy_id, proxy_dict))
 
 
-async def _check_proxy_task_async(task_self, proxy_id: int) -> Dict[str, Any]:
+async def _check_proxy_task_async(
+    task_self,
+    proxy_id: int,
+    proxy_dict: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """Async implementation of check_proxy_task."""
+    if proxy_dict is not None:
+        # Part of a bulk check: never raise, so one bad proxy can't keep the
+        # chord callback from recording the others
+        try:
+            check_result = await _probe_proxy(proxy_id, proxy_dict)
+        except Exception as e:
+            logger.exception(f"Error checking proxy {proxy_id}: {str(e)}")
+            check_result = {"is_working": False, "latency_ms": None, "error": str(e)}
+
+        return {
+            "proxy_id": proxy_id,
+            "host": proxy_dict["host"],
+            "port": proxy_dict["port"],
+            **check_result
+        }
+
     async with async_session_maker() as db:
         try:
             logger.info(f"Checking proxy {proxy_id}")
@@ -438,10 +669,7 @@ async def _check_proxy_task_async(task_self, proxy_id: int) -> Dict[str, Any]:
             if not proxy:
                 raise ValueError(f"Proxy {proxy_id} not found")
 
-            # Check proxy
-            from app.services.proxy_checker import ProxyChecker
-            checker = ProxyChecker()
-            check_result = await asyncio.to_thread(checker.check_proxy, _proxy_to_dict(proxy))
+            check_result = await _probe_proxy(proxy_id, _proxy_to_dict(proxy))
 
             # Update proxy status
             proxy.last_checked = datetime.utcnow()
@@ -475,17 +703,103 @@ async def _check_proxy_task_async(task_self, proxy_id: int) -> Dict[str, Any]:
             logger.exception(f"Error checking proxy {proxy_id}: {str(e)}")
 
             # Mark proxy as error status
-            result = await db.execute(select(Proxy).where(Proxy.id == proxy_id))
-            proxy = result.scalar_one_or_none()
-
-            if proxy:
-                proxy.status = ProxyStatus.ERROR
-                proxy.last_checked = datetime.utcnow()
-                await db.commit()
+            await db.rollback()
+            await db.execute(
+                update(Proxy)
+                .where(Proxy.id == proxy_id)
+                .values(status=ProxyStatus.ERROR, last_checked=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
 
             raise
 
 
+async def _probe_proxy(proxy_id: int, proxy_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Check a proxy, reusing a recent probe of the same proxy if any."""
+    cache_key = (
+        f"proxycheck:{proxy_dict['type']}:{proxy_dict['host']}:{proxy_dict['port']}:"
+        f"{proxy_dict.get('username') or ''}"
+    )
+    check_result = await _cache_get(cache_key)
+
+    if check_result is None:
+        from app.services.proxy_checker import ProxyChecker
+        checker = ProxyChecker()
+        probe = await asyncio.to_thread(checker.check_proxy, proxy_dict)
+        check_result = {
+            "is_working": probe.get("is_working"),
+            "latency_ms": probe.get("latency_ms"),
+            "error": probe.get("error"),
+        }
+        await _cache_set(cache_key, check_result, PROXY_CHECK_CACHE_TTL)
+    else:
+        logger.info(f"Using cached check result for proxy {proxy_id}")
+
+    return check_result
+
+
+@celery_app.task(
+    bind=True,
+    name="app.worker.tasks.record_proxy_checks_task"
+)
+def record_proxy_checks_task(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Store the results of a bulk proxy check with a single UPDATE.
+
+    Args:
+        results: check_proxy_task results (chord header output)
+
+    Returns:
+        Dictionary with counts of checked and working proxies
+    """
+    return run_async(_record_proxy_checks_task_async(self, results))
+
+
+async def _record_proxy_checks_task_async(
+    task_self,
+    results: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Async implementation of record_proxy_checks_task."""
+    if not results:
+        return {"proxies_checked": 0, "working": 0}
+
+    status_type = Proxy.__table__.c.status.type
+    statuses = {
+        r["proxy_id"]: literal(
+            ProxyStatus.ACTIVE if r.get("is_working") else ProxyStatus.ERROR,
+            status_type
+        )
+        for r in results
+    }
+    latencies = {
+        r["proxy_id"]: r.get("latency_ms")
+        for r in results
+        if r.get("is_working")
+    }
+
+    values: Dict[str, Any] = {
+        "status": case(statuses, value=Proxy.id),
+        "last_checked": datetime.utcnow(),
+    }
+    if latencies:
+        values["latency_ms"] = case(latencies, value=Proxy.id, else_=Proxy.latency_ms)
+
+    async with async_session_maker() as db:
+        await db.execute(
+            update(Proxy)
+            .where(Proxy.id.in_(statuses))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+    working = sum(1 for r in results if r.get("is_working"))
+    logger.info(f"Recorded proxy checks: {working}/{len(results)} working")
+
+    return {"proxies_checked": len(results), "working": working}
+
+
 @celery_app.task(
     bind=True,
     name="app.worker.tasks.batch_process_video_task"
@@ -534,26 +848,24 @@ async def _batch_process_video_task_async(
                 raise ValueError(f"Campaign {campaign_id} not found")
 
             # Initialize video processor
-            from app.services.video_processor import VideoProcessor
-            processor = VideoProcessor()
+            processor = _get_video_processor()
+
+            # Create variations concurrently (FFmpeg runs as async
+            # subprocesses, bounded by the processor's semaphore); failed
+            # variations are logged and skipped
+            output_dir = os.path.join(os.path.dirname(video_path), "variations")
+            results = await processor.batch_process(
+                video_path, count, output_dir, numbered=True
+            )
 
-            # Create variations
             variations = []
-            for i in range(count):
-                try:
-                    # Create unique variation
-                    variation_path = await asyncio.to_thread(
-                        processor.create_variation,
-                        video_path,
-                        variation_number=i + 1
-                    )
-
+            for entry in results:
+                if entry['success']:
+                    variation_path = entry['result']['output_path']
                     variations.append(variation_path)
-                    logger.info(f"Created variation {i + 1}/{count}: {variation_path}")
-
-                except Exception as e:
-                    logger.error(f"Failed to create variation {i + 1}: {str(e)}")
-                    continue
+                    logger.info(f"Created variation {entry['index'] + 1}/{count}: {variation_path}")
+                else:
+                    logger.error(f"Failed to create variation {entry['index'] + 1}: {entry['error']}")
 
             logger.info(
                 f"Batch processing completed: {len(variations)}/{count} variations created"
@@ -571,6 +883,53 @@ async def _batch_process_video_task_async(
             raise
 
 
+@celery_app.task(
+    bind=True,
+    ignore_result=False,  # Collected by chords fanning a batch out over workers
+    name="app.worker.tasks.make_variation_task"
+)
+def make_variation_task(self, video_path: str, index: int) -> Dict[str, Any]:
+    """
+    Create one unique variation of a video.
+
+    The per-task counterpart of batch_process_video_task: a group of these
+    spreads a batch over every processing worker instead of one. Failed
+    variations are reported rather than raised, so a chord waiting on the
+    group still fires with the variations that did succeed.
+
+    Args:
+        video_path: Path to the source video
+        index: Variation index (also used as the variation seed)
+
+    Returns:
+        Dictionary with the index, success flag and output path or error
+    """
+    return run_async(_make_variation_task_async(video_path, index))
+
+
+async def _make_variation_task_async(video_path: str, index: int) -> Dict[str, Any]:
+    """Async implementation of make_variation_task."""
+    from app.services.video_processor import VideoProcessorError
+
+    if not os.path.exists(video_path):
+        raise ValueError(f"Video file not found: {video_path}")
+
+    processor = _get_video_processor()
+    output_dir = os.path.join(os.path.dirname(video_path), "variations")
+    # Same seed and name as create_variation(variation_number=index + 1)
+    output_filename = f"variation_{index + 1}_{uuid.uuid4()}.{processor.output_format}"
+    output_path = os.path.join(output_dir, output_filename)
+
+    try:
+        result = await processor.process_video(video_path, output_path, variation_seed=index + 1)
+    except VideoProcessorError as e:
+        logger.error(f"Failed to create variation {index + 1}: {str(e)}")
+        return {"index": index, "success": False, "error": str(e)}
+
+    logger.info(f"Created variation {index + 1}: {result['output_path']}")
+    return {"index": index, "success": True, "output_path": result["output_path"]}
+
+
 # Additional helper tasks
 
 @celery_app.task(
@@ -596,22 +955,18 @@ async def _cleanup_old_jobs_task_async(task_self, days: int = 30) -> Dict[str, A
         try:
             cutoff_date = datetime.utcnow() - timedelta(days=days)
 
-            # Get old completed/failed jobs
+            # Delete old completed/failed jobs in a single statement
             result = await db.execute(
-                select(Job).where(
+                delete(Job)
+                .where(
                     Job.status.in_([JobStatus.COMPLETED, JobStatus.FAILED]),
                     Job.completed_at < cutoff_date
                 )
+                .execution_options(synchronize_session=False)
             )
-            old_jobs = result.scalars().all()
-
-            # Delete jobs
-            for job in old_jobs:
-                await db.delete(job)
-
             await db.commit()
 
-            deleted_count = len(old_jobs)
+            deleted_count = result.rowcount
             logger.info(f"Cleaned up {deleted_count} old jobs")
 
             return {
@@ -624,6 +979,48 @@ async def _cleanup_old_jobs_task_async(task_self, days: int = 30) -> Dict[str, A
             raise
 
 
+@celery_app.task(
+    bind=True,
+    name="app.worker.tasks.cleanup_temp_videos_task"
+)
+def cleanup_temp_videos_task(self, max_age_minutes: int = 60) -> Dict[str, Any]:
+    """
+    Remove per-job temporary videos that upload tasks failed to delete.
+
+    Args:
+        max_age_minutes: Only files older than this are removed
+
+    Returns:
+        Dictionary with cleanup results
+    """
+    temp_dir = os.path.join(settings.upload_dir, "videos", "temp")
+    cutoff = time.time() - max_age_minutes * 60
+    deleted_count = 0
+
+    try:
+        entries = list(os.scandir(temp_dir))
+    except FileNotFoundError:
+        entries = []
+
+    for entry in entries:
+        try:
+            if entry.is_file(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+                deleted_count += 1
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to remove temp file {entry.path}: {e}")
+
+    if deleted_count:
+        logger.info(f"Removed {deleted_count} stale temp files from {temp_dir}")
+
+    return {
+        "deleted_count": deleted_count,
+        "temp_dir": temp_dir
+    }
+
+
 @celery_app.task(
     bind=True,
     name="app.worker.tasks.check_all_proxies_task"
@@ -645,11 +1042,16 @@ async def _check_all_proxies_task_async(task_self) -> Dict[str, Any]:
             result = await db.execute(select(Proxy))
             proxies = result.scalars().all()
 
-            # Schedule check task for each proxy
+            # Schedule check task for each proxy over one broker connection.
+            # Connection details travel in the payload so the checks don't
+            # re-read their rows, and the callback stores all results at once.
             task_ids = []
-            for proxy in proxies:
-                result = check_proxy_task.delay(proxy.id)
-                task_ids.append(result.id)
+            if proxies:
+                callback_result = chord(
+                    check_proxy_task.s(proxy.id, _proxy_to_dict(proxy))
+                    for proxy in proxies
+                )(record_proxy_checks_task.s())
+                task_ids = [result.id for result in callback_result.parent.results]
 
             logger.info(f"Scheduled proxy checks for {len(proxies)} proxies")
 
@@ -768,12 +1170,14 @@ async def _warmup_account_task_async(task_self, account_id: int) -> Dict[str, An
             logger.exception(f"Error warming up account {account_id}: {str(e)}")
 
             # Mark account as inactive on unexpected errors
-            result = await db.execute(select(Account).where(Account.id == account_id))
-            account = result.scalar_one_or_none()
-
-            if account:
-                account.status = AccountStatus.INACTIVE
-                await db.commit()
+            await db.rollback()
+            await db.execute(
+                update(Account)
+                .where(Account.id == account_id)
+                .values(status=AccountStatus.INACTIVE)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
 
             raise
 
@@ -858,12 +1262,99 @@ async def _warmup_all_pending_accounts_task_async(task_self) -> Dict[str, Any]:
 
 # Helper functions
 
+async def _cache_get(key: str) -> Optional[Any]:
+    """
+    Read a JSON value from the Redis result backend.
+
+    The backend's client is synchronous, so the call runs in the I/O pool
+    instead of blocking the worker's shared event loop.
+
+    Returns None on a miss, when the backend has no client, or on errors
+    (caching is best-effort and must never fail a task).
+    """
+    client = getattr(celery_app.backend, "client", None)
+    if client is None:
+        return None
+    try:
+        raw = await asyncio.to_thread(client.get, key)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        return None
+    return json.loads(raw) if raw is not None else None
+
+
+async def _cache_set(key: str, value: Any, ttl: int) -> None:
+    """Store a JSON value in the Redis result backend with a TTL (best-effort)."""
+    client = getattr(celery_app.backend, "client", None)
+    if client is None:
+        return
+    try:
+        await asyncio.to_thread(client.set, key, json.dumps(value), ex=ttl)
+    except Exception as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
+
+
+async def _update_job(db: AsyncSession, job_id: int, **values: Any) -> None:
+    """Apply a job status transition with a single UPDATE and commit it."""
+    await db.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+def _account_cookies(account: Account) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Return an account's cookies as a Playwright cookie list, plus a digest.
+
+    Accepts the stored list, a CookieManager-style {"cookies": [...]} export,
+    or a JSON string of either (a bare string would otherwise be taken as a
+    cookies file path by TikTokUploader). Results are cached per
+    (id, updated_at); callers must treat the list as read-only.
+    """
+    key = (account.id, account.updated_at)
+    entry = _ACCOUNT_COOKIES.get(key)
+    if entry is None:
+        cookies = account.cookies or []
+        if isinstance(cookies, str):
+            cookies = json.loads(cookies)
+        if isinstance(cookies, dict):
+            cookies = cookies.get("cookies", [])
+
+        digest = hashlib.blake2b(
+            json.dumps(cookies, sort_keys=True).encode(),
+            digest_size=8
+        ).hexdigest()
+        entry = (cookies, digest)
+
+        if account.id is not None:
+            if len(_ACCOUNT_COOKIES) >= ACCOUNT_COOKIES_CACHE_SIZE:
+                _ACCOUNT_COOKIES.clear()
+            _ACCOUNT_COOKIES[key] = entry
+    return entry
+
+
 def _proxy_to_dict(proxy: Proxy) -> Dict[str, Any]:
-    """Convert Proxy model to dictionary."""
-    return {
-        "host": proxy.host,
-        "port": proxy.port,
-        "username": proxy.username,
-        "password": proxy.password,
-        "type": proxy.type.value,
-    }
+    """
+    Convert Proxy model to dictionary.
+
+    Results are cached per (id, updated_at), so an edited proxy gets a fresh
+    dict. Callers must treat the returned dict as read-only.
+    """
+    key = (proxy.id, proxy.updated_at)
+    proxy_dict = _PROXY_DICTS.get(key)
+    if proxy_dict is None:
+        proxy_dict = {
+            "host": proxy.host,
+            "port": proxy.port,
+            "username": proxy.username,
+            "password": proxy.password,
+            "type": proxy.type.value,
+        }
+        if proxy.id is not None:
+            if len(_PROXY_DICTS) >= PROXY_DICT_CACHE_SIZE:
+                _PROXY_DICTS.clear()
+            _PROXY_DICTS[key] = proxy_dict
+    return proxy_dict
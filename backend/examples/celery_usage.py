@@ -6,100 +6,250 @@ for video uploads, campaign management, and system maintenance.
 """
 
 import asyncio
-from datetime import datetime, timedelta
-from app.worker.tasks import (
-    upload_video_task,
-    start_campaign_task,
-    test_account_task,
-    check_proxy_task,
-    batch_process_video_task,
-    cleanup_old_jobs_task,
-    check_all_proxies_task,
-)
-from app.worker.celery_app import celery_app
+import threading
+import time
+from collections import deque
+from celery import chord, group
+from app.config import settings
 
+# Tasks and the Celery app are imported inside the functions that use them:
+# app.worker pulls in the database layer and every service, so running one
+# example (or importing a helper) shouldn't pay for all of it up front.
 
-def example_upload_single_video():
-    """Example: Upload a video immediately."""
-    print("Example 1: Upload single video")
 
-    job_id = 123  # Replace with actual job ID
+class QueueFullError(Exception):
+    """Raised when a broker queue stays above the allowed depth."""
+    pass
 
-    # Schedule immediate upload
-    result = upload_video_task.delay(job_id)
 
-    print(f"Task ID: {result.id}")
-    print(f"Task State: {result.state}")
+def _task_queue(task):
+    """Return the name of the queue a task is routed to."""
+    from app.worker.celery_app import celery_app
 
-    # Wait for result (optional)
-    # result.wait(timeout=300)
-    # print(f"Result: {result.result}")
+    return celery_app.amqp.router.route({}, task.name)["queue"].name
 
 
-def example_upload_scheduled():
-    """Example: Upload a video with a delay."""
-    print("\nExample 2: Upload scheduled video")
+def _queue_depth(queue_name):
+    """Return the number of messages waiting in a broker queue."""
+    from app.worker.celery_app import celery_app
 
-    job_id = 124
+    with celery_app.connection_for_write() as conn:
+        try:
+            return conn.default_channel.queue_declare(
+                queue=queue_name, passive=True
+            ).message_count
+        except conn.channel_errors:
+            return 0  # Queue not declared yet, so nothing is waiting
+
+
+def _wait_for_queue_capacity(queue_name, max_depth=None, max_wait=300):
+    """
+    Block while a queue holds more than `max_depth` messages.
+
+    Backs off exponentially (0.5s doubling to 30s) and raises QueueFullError
+    if the backlog hasn't drained after `max_wait` seconds.
+    """
+    max_depth = max_depth or settings.celery_max_queue_depth
+    delay, waited = 0.5, 0.0
+    while True:
+        depth = _queue_depth(queue_name)
+        if depth <= max_depth:
+            return
+        if waited >= max_wait:
+            raise QueueFullError(
+                f"Queue {queue_name} still holds {depth} tasks (max {max_depth})"
+            )
+        time.sleep(delay)
+        waited += delay
+        delay = min(delay * 2, 30)
+
+
+def _enqueue_with_backpressure(task, args=None, max_depth=None, **options):
+    """Enqueue a task once its queue has room (see _wait_for_queue_capacity)."""
+    _wait_for_queue_capacity(options.get("queue") or _task_queue(task), max_depth)
+    return task.apply_async(args=args, **options)
+
+
+def bulk_delay(task, arg_lists, chunk=500, spacing=0, **options):
+    """
+    Enqueue many calls of a task over a shared broker connection.
+
+    The producer is held for up to `chunk` publishes at a time and then
+    released, so a long enqueue doesn't starve other publishers of the pool.
+    Extra `options` are passed to every apply_async() call. With `spacing`,
+    the Nth call is delayed by a further N * `spacing` seconds, staggering
+    the batch without computing an ETA per task.
+
+    Returns:
+        List of AsyncResult objects, in the order of `arg_lists`
+    """
+    from app.worker.celery_app import celery_app
 
-    # Schedule upload to start in 5 minutes
-    result = upload_video_task.apply_async(
-        args=[job_id],
-        countdown=300  # 5 minutes in seconds
-    )
+    arg_lists = list(arg_lists)
+    countdown = options.pop("countdown", 0)
+    results = []
+    for start in range(0, len(arg_lists), chunk):
+        with celery_app.producer_pool.acquire(block=True) as producer:
+            for i, args in enumerate(arg_lists[start:start + chunk], start):
+                if spacing or countdown:
+                    options["countdown"] = countdown + i * spacing
+                results.append(task.apply_async(args=args, producer=producer, **options))
+    return results
+
+
+def windowed_delay(task, arg_lists, max_in_flight=None, **options):
+    """
+    Enqueue many calls of a task with at most `max_in_flight` unfinished.
+
+    Once the window is full, waits for the oldest task to finish before
+    publishing the next one. Countdown/ETA tasks sit in worker memory until
+    they run, so this bounds how many a long schedule parks there at once.
+    The task must store its results (ignore_result=False).
+
+    Returns:
+        List of AsyncResult objects, in the order of `arg_lists`
+    """
+    max_in_flight = max_in_flight or settings.celery_max_in_flight_tasks
+    window = deque()
+    results = []
+    for args in arg_lists:
+        if len(window) >= max_in_flight:
+            window.popleft().get(propagate=False)
+        result = task.apply_async(args=args, **options)
+        window.append(result)
+        results.append(result)
+    return results
 
-    print(f"Task ID: {result.id}")
-    print(f"Scheduled to start in 5 minutes")
 
+def monitor_group(signatures, timeout=300):
+    """
+    Run task signatures as a group and wait for all of their results.
 
-def example_upload_at_specific_time():
-    """Example: Upload at a specific time."""
-    print("\nExample 3: Upload at specific time")
+    With a Redis (or RPC) result backend, join_native() collects every
+    result over one subscription instead of polling each task in turn.
+    Other backends fall back to join(), which polls.
 
-    job_id = 125
+    Returns:
+        List of results (exceptions in place of failed tasks' results)
+    """
+    result = group(signatures).apply_async()
+    if result.supports_native_join:
+        return result.join_native(timeout=timeout, propagate=False)
+    return result.join(timeout=timeout, propagate=False)
 
-    # Schedule upload for tomorrow at 9 AM
-    upload_time = datetime.now().replace(
-        hour=9, minute=0, second=0, microsecond=0
-    ) + timedelta(days=1)
 
-    result = upload_video_task.apply_async(
-        args=[job_id],
-        eta=upload_time
-    )
+_EVENT_STATE = None
+_EVENT_STATE_LOCK = threading.Lock()
 
-    print(f"Task ID: {result.id}")
-    print(f"Scheduled for: {upload_time}")
 
+def _capture_events(state):
+    """Feed worker/task events into `state` until the process exits."""
+    from app.worker.celery_app import celery_app
 
-def example_start_campaign():
-    """Example: Start a campaign with multiple accounts."""
-    print("\nExample 4: Start campaign")
+    with celery_app.connection() as conn:
+        recv = celery_app.events.Receiver(conn, handlers={"*": state.event})
+        recv.capture(limit=None, timeout=None, wakeup=True)
 
-    campaign_id = 456
-    account_ids = [1, 2, 3, 4, 5]  # Replace with actual account IDs
 
-    # Start campaign
-    result = start_campaign_task.delay(
-        campaign_id=campaign_id,
-        account_ids=account_ids
-    )
+def event_state(warmup=2.5):
+    """
+    Return an in-memory snapshot of the cluster, kept current by events.
+
+    The first call starts a background event receiver and waits `warmup`
+    seconds for workers to report in (wakeup=True asks them to send a
+    heartbeat straight away). Later reads are local and cost no broker
+    traffic, unlike control.inspect(), which broadcasts and waits for every
+    worker on each call. Workers must send task events
+    (worker_send_task_events is enabled in celery_app).
+    """
+    global _EVENT_STATE
+    from app.worker.celery_app import celery_app
+
+    with _EVENT_STATE_LOCK:
+        if _EVENT_STATE is None:
+            _EVENT_STATE = celery_app.events.State()
+            threading.Thread(
+                target=_capture_events, args=(_EVENT_STATE,),
+                name="celery-events", daemon=True,
+            ).start()
+            time.sleep(warmup)
+    return _EVENT_STATE
+
+
+def _seconds_until_tomorrow_at(hour):
+    """Return the number of seconds until tomorrow at `hour`:00 local time."""
+    now = time.localtime()
+    # mktime normalizes the day overflow and applies DST for the target date
+    return time.mktime(
+        (now.tm_year, now.tm_mon, now.tm_mday + 1, hour, 0, 0, 0, 0, -1)
+    ) - time.time()
+
+
+# Examples that are a single task dispatch:
+# (title, task name in app.worker.tasks, args, apply_async options, note
+# printed after dispatch).
+# Callable option values are evaluated when the example runs.
+EXAMPLES = [
+    ("Upload single video", "upload_video_task", [123], {},
+     None),
+    ("Upload scheduled video", "upload_video_task", [124], {"countdown": 300},
+     "Scheduled to start in 5 minutes"),
+    ("Upload at specific time", "upload_video_task", [125], {"countdown": lambda: _seconds_until_tomorrow_at(9)},
+     "Scheduled for tomorrow at 9 AM"),
+    ("Start campaign", "start_campaign_task", None,
+     {"kwargs": {"campaign_id": 456, "account_ids": [1, 2, 3, 4, 5]}},
+     "Campaign started with 5 accounts"),
+    ("Batch process video", "batch_process_video_task", ["/path/to/video.mp4", 10, 456], {},
+     "Creating 10 video variations"),
+    ("Clean up old jobs", "cleanup_old_jobs_task", None, {"kwargs": {"days": 30}},
+     "Cleaning up jobs older than 30 days"),
+    ("Custom retry", "upload_video_task", [123],
+     {"retry": True, "retry_policy": {
+         'max_retries': 5,
+         'interval_start': 10,
+         'interval_step': 20,
+         'interval_max': 300,
+     }},
+     "Custom retry policy applied"),
+]
+
+
+def run(example):
+    """
+    Dispatch one EXAMPLES entry and print its task ID.
+
+    Goes through _enqueue_with_backpressure, so it waits if the task's
+    queue is already backed up. Only the task ID is used, so the result
+    is not stored.
+    """
+    from app.worker import tasks
+
+    title, task_name, args, options, note = example
+    task = getattr(tasks, task_name)
+    print(f"\nExample: {title}")
+
+    options = {k: v() if callable(v) else v for k, v in options.items()}
+    result = _enqueue_with_backpressure(task, args=args, ignore_result=True, **options)
 
     print(f"Task ID: {result.id}")
-    print(f"Campaign started with {len(account_ids)} accounts")
+    if note:
+        print(note)
 
 
 def example_test_accounts():
     """Example: Test multiple accounts."""
-    print("\nExample 5: Test accounts")
+    from app.worker.tasks import test_account_task
+
+    print("\nExample: Test accounts")
 
     account_ids = [1, 2, 3]
 
-    # Schedule test task for each account
-    results = []
-    for account_id in account_ids:
-        result = test_account_task.delay(account_id)
-        results.append(result)
+    # Schedule test task for each account in a single dispatch
+    results = group(
+        test_account_task.s(account_id) for account_id in account_ids
+    ).apply_async()
+
+    for account_id, result in zip(account_ids, results.results):
         print(f"Testing account {account_id}: Task {result.id}")
 
     print(f"Started {len(results)} account tests")
@@ -107,60 +257,42 @@ def example_test_accounts():
 
 def example_check_proxies():
     """Example: Check proxy health."""
-    print("\nExample 6: Check proxies")
-
-    proxy_ids = [10, 11, 12]
-
-    # Check specific proxies
-    for proxy_id in proxy_ids:
-        result = check_proxy_task.delay(proxy_id)
-        print(f"Checking proxy {proxy_id}: Task {result.id}")
-
-    # Or check all proxies
-    result = check_all_proxies_task.delay()
-    print(f"Checking all proxies: Task {result.id}")
-
-
-def example_batch_process():
-    """Example: Create video variations."""
-    print("\nExample 7: Batch process video")
-
-    video_path = "/path/to/video.mp4"
-    count = 10
-    campaign_id = 456
-
-    # Create 10 variations
-    result = batch_process_video_task.delay(
-        video_path=video_path,
-        count=count,
-        campaign_id=campaign_id
-    )
+    from app.worker.celery_app import celery_app
+    from app.worker.tasks import check_proxy_task, check_all_proxies_task
 
-    print(f"Task ID: {result.id}")
-    print(f"Creating {count} video variations")
+    print("\nExample: Check proxies")
 
+    proxy_ids = [10, 11, 12]
 
-def example_cleanup():
-    """Example: Clean up old jobs."""
-    print("\nExample 8: Clean up old jobs")
+    # Reuse one broker connection for every publish below
+    with celery_app.producer_pool.acquire(block=True) as producer:
+        # Check specific proxies
+        results = group(
+            check_proxy_task.s(proxy_id) for proxy_id in proxy_ids
+        ).apply_async(producer=producer, ignore_result=True)
 
-    # Clean up jobs older than 30 days
-    result = cleanup_old_jobs_task.delay(days=30)
+        for proxy_id, result in zip(proxy_ids, results.results):
+            print(f"Checking proxy {proxy_id}: Task {result.id}")
 
-    print(f"Task ID: {result.id}")
-    print("Cleaning up jobs older than 30 days")
+        # Or check all proxies
+        result = check_all_proxies_task.apply_async(producer=producer)
+        print(f"Checking all proxies: Task {result.id}")
 
 
 def example_task_chaining():
-    """Example: Chain tasks together."""
-    print("\nExample 9: Chain tasks")
+    """Example: Fan out variations, then start the campaign."""
+    from app.worker.tasks import start_campaign_task, make_variation_task
+
+    print("\nExample: Chain tasks")
 
-    from celery import chain
+    video_path = "/path/to/video.mp4"
 
-    # Chain: Process video -> Create variations -> Start campaign
-    workflow = chain(
-        batch_process_video_task.s("/path/to/video.mp4", 5, 456),
-        start_campaign_task.s(456, [1, 2, 3, 4, 5])
+    # Each variation is its own task, so the batch is spread over every
+    # processing worker; the campaign starts once all of them have finished.
+    # si() keeps the variation results out of start_campaign_task's arguments
+    workflow = chord(
+        group(make_variation_task.s(video_path, i) for i in range(5)),
+        start_campaign_task.si(456, [1, 2, 3, 4, 5])
     )
 
     result = workflow.apply_async()
@@ -169,9 +301,9 @@ def example_task_chaining():
 
 def example_task_grouping():
     """Example: Run tasks in parallel."""
-    print("\nExample 10: Group tasks")
+    from app.worker.tasks import test_account_task
 
-    from celery import group
+    print("\nExample: Group tasks")
 
     # Test multiple accounts in parallel
     job = group(
@@ -184,9 +316,34 @@ def example_task_grouping():
     print(f"Group started: {len(result)} tasks")
 
 
+def example_test_accounts_chunked(account_ids=None, chunk_size=10):
+    """Example: Test a very large account list in batches."""
+    from app.worker.tasks import test_account_task
+
+    print("\nExample: Chunked account tests")
+
+    account_ids = account_ids or list(range(1, 1001))
+
+    # One message per `chunk_size` accounts instead of one per account.
+    # Each chunk is a single celery.starmap task that calls
+    # test_account_task directly, which means:
+    #   - the 30/m rate_limit of test_account_task does not apply;
+    #   - the accounts share one 25-minute soft time limit, one browser
+    #     login after another, so keep chunk_size small;
+    #   - the first account that raises fails the rest of its chunk.
+    # Keep plain groups when per-account retries or rate limiting matter.
+    result = test_account_task.chunks(
+        zip(account_ids), chunk_size
+    ).apply_async(queue="tests")
+
+    print(f"Chunked group started: {len(result)} batches for {len(account_ids)} accounts")
+
+
 def example_task_callback():
     """Example: Task with callback."""
-    print("\nExample 11: Task with callback")
+    from app.worker.tasks import upload_video_task
+
+    print("\nExample: Task with callback")
 
     def on_success(result):
         print(f"Upload completed: {result}")
@@ -205,27 +362,29 @@ def example_task_callback():
 
 def example_monitor_task():
     """Example: Monitor task progress."""
-    print("\nExample 12: Monitor task")
+    from app.worker.tasks import upload_video_task
 
-    job_id = 123
-    result = upload_video_task.delay(job_id)
+    print("\nExample: Monitor task")
 
-    print(f"Task ID: {result.id}")
+    job_ids = [123, 124, 125]
 
-    # Check task state
-    print(f"State: {result.state}")
-
-    # Wait for result with timeout
+    # Wait for all uploads with one timeout instead of a get() per task
     try:
-        final_result = result.get(timeout=300)  # 5 minute timeout
-        print(f"Task completed: {final_result}")
+        results = monitor_group(
+            [upload_video_task.s(job_id) for job_id in job_ids],
+            timeout=300  # 5 minute timeout
+        )
+        for job_id, final_result in zip(job_ids, results):
+            print(f"Job {job_id} finished: {final_result}")
     except Exception as e:
-        print(f"Task failed or timed out: {e}")
+        print(f"Tasks timed out: {e}")
 
 
 def example_revoke_task():
     """Example: Cancel a task."""
-    print("\nExample 13: Revoke task")
+    from app.worker.tasks import upload_video_task
+
+    print("\nExample: Revoke task")
 
     # Schedule a task
     result = upload_video_task.apply_async(
@@ -242,54 +401,72 @@ def example_revoke_task():
 
 def example_inspect_workers():
     """Example: Inspect worker status."""
-    print("\nExample 14: Inspect workers")
-
-    from app.worker.celery_app import celery_app
+    print("\nExample: Inspect workers")
 
-    # Get active tasks
-    inspect = celery_app.control.inspect()
+    # Read from the event-fed snapshot instead of broadcasting
+    # control.inspect() requests to every worker
+    state = event_state()
 
-    active = inspect.active()
+    fields = ("uuid", "name", "hostname", "args", "eta")
+    active = [
+        task.info(fields) for task in state.tasks.values()
+        if task.state == "STARTED"
+    ]
     print(f"Active tasks: {active}")
 
-    scheduled = inspect.scheduled()
+    scheduled = [
+        task.info(fields) for task in state.tasks.values()
+        if task.state == "RECEIVED" and task.eta
+    ]
     print(f"Scheduled tasks: {scheduled}")
 
-    stats = inspect.stats()
+    stats = {
+        hostname: {"alive": worker.alive, "active": worker.active, "processed": worker.processed}
+        for hostname, worker in state.workers.items()
+    }
     print(f"Worker stats: {stats}")
 
 
 def example_rate_limiting():
     """Example: Rate-limited task execution."""
-    print("\nExample 15: Rate limiting")
+    from app.worker.tasks import upload_video_task
+
+    print("\nExample: Rate limiting")
 
     # Upload multiple videos with rate limiting
     job_ids = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
 
-    for job_id in job_ids:
-        # Tasks will be rate-limited to 10/minute automatically
-        result = upload_video_task.delay(job_id)
+    # Don't add to a queue that is already backed up; one depth check
+    # covers the whole batch
+    _wait_for_queue_capacity(_task_queue(upload_video_task))
+
+    # Workers still rate-limit uploads to 10/minute automatically; the
+    # window keeps a long backlog from piling up in their memory
+    results = windowed_delay(upload_video_task, [[job_id] for job_id in job_ids])
+
+    for job_id, result in zip(job_ids, results):
         print(f"Scheduled job {job_id}: Task {result.id}")
 
 
-def example_retry_configuration():
-    """Example: Custom retry configuration."""
-    print("\nExample 16: Custom retry")
+def example_staggered_uploads():
+    """Example: Spread a batch of uploads over time."""
+    from app.worker.tasks import upload_video_task
 
-    # Upload with custom retry settings
-    result = upload_video_task.apply_async(
-        args=[123],
-        retry=True,
-        retry_policy={
-            'max_retries': 5,
-            'interval_start': 10,
-            'interval_step': 20,
-            'interval_max': 300,
-        }
+    print("\nExample: Staggered uploads")
+
+    job_ids = list(range(100, 120))
+
+    # One upload every 10 minutes, published over a shared connection.
+    # Only the task IDs are printed, so skip storing the results
+    results = bulk_delay(
+        upload_video_task,
+        [[job_id] for job_id in job_ids],
+        spacing=600,
+        ignore_result=True,
     )
 
-    print(f"Task ID: {result.id}")
-    print("Custom retry policy applied")
+    for job_id, result in zip(job_ids, results):
+        print(f"Scheduled job {job_id}: Task {result.id}")
 
 
 def main():
@@ -298,20 +475,19 @@ def main():
     print("Celery Task Usage Examples - TikTok Auto-Poster")
     print("=" * 60)
 
+    for example in EXAMPLES:
+        run(example)
+
     # Run examples (comment out ones you don't want to run)
-    example_upload_single_video()
-    example_upload_scheduled()
-    example_upload_at_specific_time()
-    example_start_campaign()
     example_test_accounts()
     example_check_proxies()
-    example_batch_process()
-    example_cleanup()
     example_task_chaining()
     example_task_grouping()
+    example_test_accounts_chunked()
     example_monitor_task()
     example_inspect_workers()
     example_rate_limiting()
+    example_staggered_uploads()
 
     print("\n" + "=" * 60)
     print("Examples completed!")
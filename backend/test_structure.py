@@ -5,6 +5,16 @@ Usage:
     python test_structure.py
 """
 
+# Mapped attributes each model must have (see test_model_structure)
+EXPECTED_MODEL_ATTRS = {
+    "Account": frozenset({'id', 'email', 'password', 'cookies', 'status', 'proxy_id', 'profile_id', 'last_used'}),
+    "Proxy": frozenset({'id', 'host', 'port', 'username', 'password', 'type', 'status', 'latency_ms'}),
+    "BrowserProfile": frozenset({'id', 'name', 'user_agent', 'viewport', 'timezone', 'locale', 'fingerprint'}),
+    "Campaign": frozenset({'id', 'name', 'status', 'video_path', 'caption_template', 'account_selection', 'schedule'}),
+    "Job": frozenset({'id', 'campaign_id', 'account_id', 'status', 'video_path', 'caption', 'error_message'}),
+}
+
+
 def test_imports():
     """Test that all modules can be imported."""
     print("Testing imports...")
@@ -64,37 +74,14 @@ def test_model_structure():
     """Test that models have the expected attributes."""
     print("\n\nTesting model structure...")
 
-    from app.models import Account, Proxy, BrowserProfile, Campaign, Job
-
-    # Test Account model
-    account_attrs = ['id', 'email', 'password', 'cookies', 'status', 'proxy_id', 'profile_id', 'last_used']
-    for attr in account_attrs:
-        assert hasattr(Account, attr), f"Account missing attribute: {attr}"
-    print("✓ Account model structure valid")
-
-    # Test Proxy model
-    proxy_attrs = ['id', 'host', 'port', 'username', 'password', 'type', 'status', 'latency_ms']
-    for attr in proxy_attrs:
-        assert hasattr(Proxy, attr), f"Proxy missing attribute: {attr}"
-    print("✓ Proxy model structure valid")
-
-    # Test BrowserProfile model
-    profile_attrs = ['id', 'name', 'user_agent', 'viewport', 'timezone', 'locale', 'fingerprint']
-    for attr in profile_attrs:
-        assert hasattr(BrowserProfile, attr), f"BrowserProfile missing attribute: {attr}"
-    print("✓ BrowserProfile model structure valid")
-
-    # Test Campaign model
-    campaign_attrs = ['id', 'name', 'status', 'video_path', 'caption_template', 'account_selection', 'schedule']
-    for attr in campaign_attrs:
-        assert hasattr(Campaign, attr), f"Campaign missing attribute: {attr}"
-    print("✓ Campaign model structure valid")
-
-    # Test Job model
-    job_attrs = ['id', 'campaign_id', 'account_id', 'status', 'video_path', 'caption', 'error_message']
-    for attr in job_attrs:
-        assert hasattr(Job, attr), f"Job missing attribute: {attr}"
-    print("✓ Job model structure valid")
+    from app import models
+
+    for model_name, expected in EXPECTED_MODEL_ATTRS.items():
+        model = getattr(models, model_name)
+        attrs = set(vars(model)) | set(model.__mapper__.attrs.keys())
+        missing = expected - attrs
+        assert not missing, f"{model_name} missing attributes: {', '.join(sorted(missing))}"
+        print(f"✓ {model_name} model structure valid")
 
     print("\n✓✓✓ All model structures valid! ✓✓✓")
 
@@ -111,18 +98,11 @@ def test_router_endpoints():
         jobs_router
     )
 
-    # Get route paths
-    account_routes = [route.path for route in accounts_router.routes]
-    proxy_routes = [route.path for route in proxies_router.routes]
-    profile_routes = [route.path for route in profiles_router.routes]
-    campaign_routes = [route.path for route in campaigns_router.routes]
-    job_routes = [route.path for route in jobs_router.routes]
-
-    print(f"✓ Accounts router has {len(account_routes)} endpoints")
-    print(f"✓ Proxies router has {len(proxy_routes)} endpoints")
-    print(f"✓ Profiles router has {len(profile_routes)} endpoints")
-    print(f"✓ Campaigns router has {len(campaign_routes)} endpoints")
-    print(f"✓ Jobs router has {len(job_routes)} endpoints")
+    print(f"✓ Accounts router has {len(accounts_router.routes)} endpoints")
+    print(f"✓ Proxies router has {len(proxies_router.routes)} endpoints")
+    print(f"✓ Profiles router has {len(profiles_router.routes)} endpoints")
+    print(f"✓ Campaigns router has {len(campaigns_router.routes)} endpoints")
+    print(f"✓ Jobs router has {len(jobs_router.routes)} endpoints")
 
     print("\n✓✓✓ All routers configured! ✓✓✓")
 